@@ -1,26 +1,45 @@
 import os
 import sys
-from fastapi import FastAPI, HTTPException, Depends, Header, APIRouter, Query, Security, status, UploadFile, File
+from fastapi import FastAPI, HTTPException, Depends, Header, APIRouter, Query, Security, status, UploadFile, File, Request
+from fastapi.responses import PlainTextResponse, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.engine.base import Engine
-from dotenv import load_dotenv, find_dotenv
-from db.utils import get_db_engine, fetch_table_data, register_user, login_user
+from db.config import load_dotenv_once
+from db.utils import get_db_engine, get_read_engine, fetch_table_data, table_query, register_user, login_user, with_read_failover, pin_primary_reads
+from db.singleflight import SingleFlight
+from db.frames import memory_report
 from db.load_data import main as deploy_parquet_data
-from db.process_insights import main as process_insights
-from typing import Optional
-from pydantic import BaseModel, ValidationError
+from db.process_insights import main as process_insights, TABLE_LEADERBOARDS, LEADERBOARD_METRICS, LEADERBOARD_MAX_N, LEADERBOARD_ALL_SECTORS, TABLE_COMPANY_INSIGHTS, COMPANY_SORT_KEYS
+from db.search import search_companies
+from db.distributions import fetch_distribution, DISTRIBUTION_METRICS, ALL_SECTORS
+from db.export import stream_export, EXPORT_FORMATS
+from db.slow_queries import recent_slow_queries, slow_query_ms
+from db.analytics import use_duckdb, query_insights, query_leaderboard, query_distribution
+from db.batch_load import batch_load, DEFAULT_WORKERS, DEFAULT_MAX_CONNECTIONS
+from db.metrics import HTTP_REQUEST_DURATION, SERIALIZATION_DURATION, render_metrics
+from api.ingest import IngestValidationError, INGEST_ROWS, buffer_from_env, parse_records, validate_frame, to_sensor_data, retry_after_seconds
+from api.compression import CompressionMiddleware, compression_settings_from_env
+from api.events import event_stream
+from api.profiling import ProfileStore, ProfilingMiddleware, ProfiledRoute, folded_stacks, in_sampled_thread, sampled_iter
+from db.events import DataEventBroker
+from typing import TYPE_CHECKING, Optional
+from pydantic import BaseModel, Field, ValidationError
 import jwt
 import datetime
+import itertools
+import re
+import time
 from pathlib import Path
-import pandas as pd
+
+# pandas and SQLAlchemy are only imported on first use to keep cold start fast
+if TYPE_CHECKING:
+    import pandas as pd
+    from sqlalchemy.engine.base import Engine
 
 ENV_VARS: list[str] = ["API_SECRET_KEY", "API_AUTH_SECRET_KEY"]
 
 """Loads environment variables and validates required ones."""
-if not find_dotenv():
-    print("Warning: .env file not found. Ensure it exists before running this script.")
-
-load_dotenv()
+load_dotenv_once()
 
 # Validate required environment variables
 missing_vars: list[str] = [var for var in ENV_VARS if not os.getenv(var)]
@@ -31,6 +50,7 @@ if missing_vars:
 # Retrieve API Key from environment variables
 API_SECRET_KEY = os.getenv("API_SECRET_KEY")
 API_AUTH_SECRET_KEY = os.getenv("API_AUTH_SECRET_KEY")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
 ALGORITHM: str = "HS256"
 TTL = 24 * 60  # 24 hours
 DATA_DIR = Path("/app/data")
@@ -42,13 +62,83 @@ app = FastAPI(
     version="1.0"
 )
 
-router = APIRouter(prefix="/api/v1")
+# Compress large JSON payloads (e.g. /companies, /sensor-data) when the client supports it
+app.add_middleware(CompressionMiddleware, **compression_settings_from_env())
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Record request latency per route template (e.g. /api/v1/insights/{sector})."""
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status_code),
+        )
+
+# On-demand profiling: admins send `x-profile: 1` with the API key, or PROFILE_SAMPLE_RATE picks requests
+profile_store = ProfileStore(keep=int(os.getenv("PROFILE_KEEP", "20")))
+PROFILE_INTERVAL: float = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+app.add_middleware(
+    ProfilingMiddleware,
+    store=profile_store,
+    interval=PROFILE_INTERVAL,
+    api_key=API_SECRET_KEY,
+    max_duration=float(os.getenv("PROFILE_MAX_SECONDS") or 30),
+    # Long-lived streams are only profiled on demand
+    exclude_paths=[path.strip() for path in os.getenv("PROFILE_EXCLUDE", "/api/v1/events").split(",") if path.strip()],
+)
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus metrics of this API worker (bearer METRICS_TOKEN required when set)."""
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Unauthorized")
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+router = APIRouter(prefix="/api/v1", route_class=ProfiledRoute)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def db_connect() -> Engine:
+def db_connect() -> "Engine":
     return get_db_engine()
 
+# Identical concurrent reads (same SQL and parameters) share one database call and its result
+read_flight = SingleFlight("db_read")
+
+def read_table(table_name: str) -> Optional["pd.DataFrame"]:
+    """Fetch a whole table for a read-only endpoint, from a read replica when configured.
+
+    The returned DataFrame may be shared with concurrent requests: derive new frames, don't modify it in place.
+    """
+    df = read_flight.do(
+        (table_query(table_name),),
+        lambda: with_read_failover(lambda engine: fetch_table_data(engine, table_name)),
+    )
+    memory_report(df, "api", table_name, log=False)
+    return df
+
+def read_insights(sector: Optional[str] = None) -> Optional["pd.DataFrame"]:
+    """Sector insights from the `insights` table, or computed by DuckDB when ANALYTICS_ENGINE=duckdb."""
+    if use_duckdb():
+        return read_flight.do(("duckdb", "insights", sector), lambda: query_insights(sector))
+    insights_df = read_table("insights")
+    if insights_df is not None and sector is not None:
+        insights_df = insights_df[insights_df["sector"] == sector]
+    return insights_df
+
+def to_records(df: "pd.DataFrame", endpoint: str) -> list[dict]:
+    """Convert a DataFrame to JSON-ready records, timing the serialization."""
+    with SERIALIZATION_DURATION.time(endpoint=endpoint):
+        return df.to_dict(orient="records")
+
 def create_jwt_token(username: str) -> str:
     payload = {
         "sub": username,
@@ -75,30 +165,74 @@ def root():
 def get_insights(username: str = Depends(get_current_user)):
     """Fetch sustainability insights from PostgreSQL."""
     try:
-        engine = db_connect()
-
-        insights_df = fetch_table_data(engine, "insights")
+        insights_df = read_insights()
         if insights_df is None or insights_df.empty:
             raise HTTPException(status_code=404, detail="No insights found.")
         
-        insights = insights_df.to_dict(orient="records")
+        insights = to_records(insights_df, "insights")
         return {"insights": insights}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching insights: {str(e)}")
 
+@router.get("/insights/distribution")
+def get_distribution(
+    metric: str = Query("co2_emissions", description=f"One of: {', '.join(DISTRIBUTION_METRICS)}"),
+    sector: Optional[str] = Query(None, description="Filter by sector (all sectors when omitted)"),
+    bins: int = Query(30, ge=1, le=200, description="Number of histogram bins"),
+    scale: str = Query("linear", description="Histogram bin spacing: linear or log"),
+    username: str = Depends(get_current_user)
+):
+    """Fetch a pre-binned histogram, approximate quantiles and boxplot statistics for a metric."""
+    if metric not in DISTRIBUTION_METRICS:
+        raise HTTPException(status_code=400, detail=f"Invalid metric. Choose one of: {', '.join(DISTRIBUTION_METRICS)}")
+    if scale not in ("linear", "log"):
+        raise HTTPException(status_code=400, detail="Invalid scale. Choose linear or log.")
+
+    scope = sector if sector and sector != ALL_SECTORS else ALL_SECTORS
+    if use_duckdb():
+        try:
+            distribution = read_flight.do(
+                ("duckdb", "distribution", metric, scope, bins, scale),
+                lambda: query_distribution(metric, scope, bins, scale),
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error fetching distribution: {str(e)}")
+        if distribution is None:
+            raise HTTPException(status_code=404, detail=f"No distribution found for sector: {scope}")
+        return {
+            "metric": metric,
+            "sector": scope,
+            "summary": distribution["summary"],
+            "histogram": {"scale": scale, **distribution["histogram"]},
+        }
+
+    try:
+        sketch = read_flight.do(
+            ("distributions", metric, scope),
+            lambda: with_read_failover(lambda engine: fetch_distribution(engine, metric, scope)),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching distribution: {str(e)}")
+
+    if sketch is None or sketch.count == 0:
+        raise HTTPException(status_code=404, detail=f"No distribution found for sector: {scope}")
+    return {
+        "metric": metric,
+        "sector": scope,
+        "summary": sketch.summary(),
+        "histogram": {"scale": scale, **sketch.histogram(bins, scale)},
+    }
+
 @router.get("/insights/{sector}")
 def get_sector_insights(sector: str, username: str = Depends(get_current_user)):
     """Fetch insights for a specific sector."""
     try:
-        engine = db_connect()
-
-        insights_df = fetch_table_data(engine, "insights")
-        insights_df = insights_df[insights_df["sector"] == sector]
+        insights_df = read_insights(sector)
 
-        if insights_df.empty:
+        if insights_df is None or insights_df.empty:
             raise HTTPException(status_code=404, detail=f"No insights found for sector: {sector}")
         
-        insights = insights_df.to_dict(orient="records")
+        insights = to_records(insights_df, "sector_insights")
         return {"insights": insights}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching insights for {sector}: {str(e)}")
@@ -107,9 +241,7 @@ def get_sector_insights(sector: str, username: str = Depends(get_current_user)):
 def get_sectors(username: str = Depends(get_current_user)):
     """Fetch list of unique sectors from PostgreSQL."""
     try:
-        engine = db_connect()
-
-        insights_df = fetch_table_data(engine, "insights")
+        insights_df = read_table("insights")
         sectors = insights_df["sector"].unique().tolist()
 
         return {"sectors": sectors}
@@ -120,14 +252,12 @@ def get_sectors(username: str = Depends(get_current_user)):
 def get_sensor_data(limit: int = 10, username: str = Depends(get_current_user)):
     """Fetch latest sensor data records from PostgreSQL."""
     try:
-        engine = db_connect()
-
-        sensor_data_df = fetch_table_data(engine, "sensor_data")
+        sensor_data_df = read_table("sensor_data")
 
         if sensor_data_df is None or sensor_data_df.empty:
             raise HTTPException(status_code=404, detail="No sensor data found.")
         
-        sensor_data = sensor_data_df.to_dict(orient="records")
+        sensor_data = to_records(sensor_data_df, "sensor_data")
         return {"sensor_data": sensor_data[:limit]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching sensor data: {str(e)}")
@@ -169,6 +299,8 @@ def load_data(
             print("No filename provided.")
 
         if load_success:
+            # Serve this worker's next reads from the primary until replicas catch up
+            pin_primary_reads()
             if not process_insights():
                 return {"message": "Failed to load processed insights into PostgreSQL."}
             else:
@@ -177,51 +309,244 @@ def load_data(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading data: {str(e)}")
 
+class BatchLoadDataRequest(BaseModel):
+    pattern: str
+    workers: Optional[int] = None
+    max_connections: Optional[int] = None
+    replace: bool = False
+    delete_processed: bool = False
+
+@router.post("/load-data/batch")
+def load_data_batch(
+    request: BatchLoadDataRequest,
+    x_api_key: str = Header(None),
+    username: str = Depends(get_current_user)
+):
+    """Secure API to load every Parquet shard matching a directory or glob into PostgreSQL."""
+    if not x_api_key or x_api_key != API_SECRET_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid API Key")
+
+    pattern = request.pattern.strip()
+    if not pattern:
+        raise HTTPException(status_code=400, detail="A directory or glob pattern is required.")
+
+    try:
+        report = batch_load(
+            pattern,
+            workers=request.workers or DEFAULT_WORKERS,
+            max_connections=request.max_connections or DEFAULT_MAX_CONNECTIONS,
+            replace=request.replace,
+            delete_processed=request.delete_processed,
+            data_dir=str(DATA_DIR),
+        )
+    except (ValueError, FileNotFoundError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading data: {str(e)}")
+
+    if report["loaded"]:
+        pin_primary_reads()
+    return report
+
+def fetch_companies_page(
+    engine: "Engine", sector: Optional[str], order_by: str, direction: str, page: int, page_size: int
+) -> tuple[int, int, list[dict]]:
+    """Read one page of precomputed company rows (index scan on the sort key), with the total row count."""
+    from sqlalchemy import text
+
+    where = "WHERE sector = :sector" if sector else ""
+    with engine.connect() as conn:
+        total = conn.execute(text(f"SELECT count(*) FROM {TABLE_COMPANY_INSIGHTS} {where}"), {"sector": sector}).scalar()
+        total_pages = max((total + page_size - 1) // page_size, 1)
+        page = max(1, min(page, total_pages))
+        rows = conn.execute(
+            text(
+                f"SELECT * FROM {TABLE_COMPANY_INSIGHTS} {where} "
+                f"ORDER BY {order_by} {direction}, company {direction} LIMIT :limit OFFSET :offset"
+            ),
+            {"sector": sector, "limit": page_size, "offset": (page - 1) * page_size},
+        ).mappings().all()
+    offset = (page - 1) * page_size
+    return total, page, [{"nr.": offset + position + 1, **row} for position, row in enumerate(rows)]
+
 @router.get("/companies")
 def get_companies(
     sector: Optional[str] = Query(None, description="Filter by sector"),
     page: int = Query(1, description="Page number"),
-    page_size: int = Query(10, description="Number of results per page"),
-    order_by: Optional[str] = Query("nr", description="Order by column"),
+    page_size: int = Query(10, ge=1, le=1000, description="Number of results per page"),
+    order_by: Optional[str] = Query("company", description=f"Order by column: {', '.join(COMPANY_SORT_KEYS)}"),
     order_dir: Optional[str] = Query(None, description="Order direction (asc or desc)"),
     username: str = Depends(get_current_user)
 ):
-    """Fetch paginated list of companies from PostgreSQL."""
+    """Fetch a paginated list of companies with their precomputed totals, intensities and sector ranks."""
+    order_key = order_by if order_by in COMPANY_SORT_KEYS else "company"
+    direction = "desc" if order_dir and order_dir.lower() == "desc" else "asc"
     try:
-        engine = db_connect()
-        company_df = fetch_table_data(engine, "sensor_data")
+        total, page, companies_list = read_flight.do(
+            (TABLE_COMPANY_INSIGHTS, sector, order_key, direction, page, page_size),
+            lambda: with_read_failover(
+                lambda engine: fetch_companies_page(engine, sector, order_key, direction, page, page_size)
+            ),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching companies: {str(e)}")
 
-        if company_df is None or company_df.empty:
-            raise HTTPException(status_code=404, detail="No companies found.")
-        
-        required_columns = {"company", "sector", "energy_kwh", "water_m3", "co2_emissions"}
-        if not required_columns.issubset(company_df.columns):
-            raise HTTPException(status_code=500, detail="Missing required columns in database table.")
-        
-        if sector:
-            company_df = company_df[company_df["sector"] == sector]
-        
-        company_df = company_df.reset_index(drop=True)
-        company_df.insert(0, "nr.", company_df.index + 1)
+    if total == 0:
+        raise HTTPException(status_code=404, detail="No companies found.")
+    return {
+        "companies": companies_list,
+        "total_count": total,
+        "total_pages": max((total + page_size - 1) // page_size, 1),
+        "current_page": page
+    }
 
-        if order_by and order_by in company_df.columns:
-            ascending = order_dir.lower() != "desc"
-            company_df = company_df.sort_values(by=order_by, ascending=ascending)
+@router.get("/companies/search")
+def get_companies_search(
+    q: str = Query(..., min_length=1, max_length=100, description="Company name prefix or approximate name"),
+    sector: Optional[str] = Query(None, description="Filter by sector"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    username: str = Depends(get_current_user)
+):
+    """Search companies by name (prefix matches first, then fuzzy matches), for autocomplete."""
+    try:
+        results = read_flight.do(
+            ("company_search", q, sector, limit),
+            lambda: with_read_failover(lambda engine: search_companies(engine, q, sector, limit)),
+        )
+        return {"results": results}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching companies: {str(e)}")
+
+def fetch_leaderboard(engine: "Engine", metric: str, scope: str, direction: str, n: int) -> list[dict]:
+    """Read a precomputed leaderboard (index range scan on metric, scope, direction, rank)."""
+    from sqlalchemy import text
+
+    sql = text(
+        f"SELECT rank, company, sector, value FROM {TABLE_LEADERBOARDS} "
+        "WHERE metric = :metric AND scope = :scope AND direction = :direction AND rank <= :n "
+        "ORDER BY rank"
+    )
+    with engine.connect() as conn:
+        rows = conn.execute(sql, {"metric": metric, "scope": scope, "direction": direction, "n": n}).mappings().all()
+    return [dict(row) for row in rows]
+
+@router.get("/leaderboards")
+def get_leaderboards(
+    metric: str = Query("co2_emissions", description=f"One of: {', '.join(LEADERBOARD_METRICS)}"),
+    sector: Optional[str] = Query(None, description="Filter by sector (all sectors when omitted)"),
+    n: int = Query(10, ge=1, le=LEADERBOARD_MAX_N, description="Number of companies"),
+    dir: str = Query("desc", description="desc for the highest values, asc for the lowest"),
+    username: str = Depends(get_current_user)
+):
+    """Fetch the top (or bottom) N companies for a metric, overall or within a sector."""
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"Invalid metric. Choose one of: {', '.join(LEADERBOARD_METRICS)}")
+    direction = dir.lower()
+    if direction not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="Invalid dir. Choose asc or desc.")
+
+    scope = sector if sector and sector != LEADERBOARD_ALL_SECTORS else LEADERBOARD_ALL_SECTORS
+    try:
+        if use_duckdb():
+            leaderboard = read_flight.do(
+                ("duckdb", TABLE_LEADERBOARDS, metric, scope, direction, n),
+                lambda: query_leaderboard(metric, scope, direction, n),
+            )
+        else:
+            leaderboard = read_flight.do(
+                (TABLE_LEADERBOARDS, metric, scope, direction, n),
+                lambda: with_read_failover(lambda engine: fetch_leaderboard(engine, metric, scope, direction, n)),
+            )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching leaderboard: {str(e)}")
+
+    if not leaderboard:
+        raise HTTPException(status_code=404, detail=f"No leaderboard found for sector: {scope}")
+    return {"metric": metric, "sector": scope, "dir": direction, "leaderboard": leaderboard}
+
+@router.get("/export")
+async def export_sensor_data(
+    format: str = Query("csv", description=f"Export format: {', '.join(EXPORT_FORMATS)}"),
+    sector: Optional[str] = Query(None, description="Only export this sector"),
+    id_from: Optional[int] = Query(None, alias="from", ge=1, description="First sensor_data id (inclusive)"),
+    id_to: Optional[int] = Query(None, alias="to", ge=1, description="Last sensor_data id (inclusive)"),
+    username: str = Depends(get_current_user)
+):
+    """Stream sensor data as CSV, Parquet or Arrow, batch by batch from a server-side cursor."""
+    export_format = format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid format. Choose one of: {', '.join(EXPORT_FORMATS)}")
+    if id_from is not None and id_to is not None and id_from > id_to:
+        raise HTTPException(status_code=400, detail="Invalid range: from must not be greater than to.")
+
+    chunks = sampled_iter(stream_export(get_read_engine(), export_format, sector, id_from, id_to))
+    try:
+        # Run the query and encode the first batch before answering, so database errors still map to a 500
+        first_chunk = await run_in_threadpool(next, chunks, b"")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting sensor data: {str(e)}")
+
+    media_type, extension = EXPORT_FORMATS[export_format]
+    # Header-safe ASCII filename: quotes, CR/LF and non-latin-1 characters of the sector would break the header
+    safe_sector = re.sub(r"[^\w.-]", "_", sector, flags=re.ASCII) if sector else ""
+    filename = f"sensor_data{'_' + safe_sector if safe_sector else ''}.{extension}"
+    return StreamingResponse(
+        itertools.chain([first_chunk], chunks),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get("/admin/profiles")
+def list_profiles(x_api_key: str = Header(None), username: str = Depends(get_current_user)):
+    """List the request profiles kept by this API worker (newest first)."""
+    if not x_api_key or x_api_key != API_SECRET_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid API Key")
+    return {"worker_pid": os.getpid(), "profiles": profile_store.list()}
 
-        total_pages = max((len(company_df) + page_size - 1) // page_size, 1)
-        page = max(1, min(page, total_pages))
-        paginated_companies = company_df.iloc[(page - 1) * page_size : page * page_size]
+@router.get("/admin/profiles/{profile_id}")
+def get_profile(
+    profile_id: str,
+    format: str = Query("json", description="json, or folded for flame graph tools"),
+    x_api_key: str = Header(None),
+    username: str = Depends(get_current_user)
+):
+    """Fetch one request profile with its sampled stacks."""
+    if not x_api_key or x_api_key != API_SECRET_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid API Key")
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found in worker {os.getpid()}: {profile_id}")
+    if format == "folded":
+        return PlainTextResponse(folded_stacks(profile))
+    return profile
+
+@router.get("/admin/slow-queries")
+def get_slow_queries(
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of queries"),
+    x_api_key: str = Header(None),
+    username: str = Depends(get_current_user)
+):
+    """List the slowest recent SQL statements of this API worker, with their EXPLAIN (ANALYZE, BUFFERS) plans."""
+    if not x_api_key or x_api_key != API_SECRET_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid API Key")
+    return {"worker_pid": os.getpid(), "threshold_ms": slow_query_ms(), "slow_queries": recent_slow_queries(limit)}
 
-        companies_list = paginated_companies.to_dict(orient="records")
+# Per-worker LISTEN/NOTIFY listener feeding /events
+event_broker = DataEventBroker()
 
-        return {
-            "companies": companies_list,
-            "total_pages": total_pages,
-            "current_page": page
-        }
+@app.on_event("shutdown")
+def stop_event_broker():
+    """Stop the data events listener before the worker exits."""
+    event_broker.close()
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching companies: {str(e)}")
+@router.get("/events")
+async def events(request: Request, username: str = Depends(get_current_user)):
+    """Server-Sent Events stream of data-version events (emitted when loads and insights are committed)."""
+    return StreamingResponse(
+        event_stream(request, event_broker),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 class LoginRequest(BaseModel):
     username: str
@@ -264,15 +589,17 @@ def register(request: RegisterRequest):
         raise HTTPException(status_code=400, detail="Error registering user")
 
 class ParquetFileLoadDataSchema(BaseModel):
-    """Define expected Parquet file structure."""
-    empresa: str
+    """Define expected Parquet file structure (string lengths match the sensor_data columns)."""
+    empresa: str = Field(max_length=255)
     energia_kwh: float
     agua_m3: float
     co2_emissoes: float
-    setor: str
+    setor: str = Field(max_length=100)
 
-def validate_parquet(file_path: Path) -> pd.DataFrame:
+def validate_parquet(file_path: Path) -> "pd.DataFrame":
     """Validate Parquet file structure using Pydantic."""
+    import pandas as pd
+
     try:
         df = pd.read_parquet(file_path)
 
@@ -295,6 +622,62 @@ def validate_parquet(file_path: Path) -> pd.DataFrame:
     except Exception as e:
         raise ValueError(f"Invalid Parquet format: {str(e)}")
 
+# Per-worker micro-batching buffer for /ingest
+ingest_buffer = buffer_from_env()
+
+@app.on_event("shutdown")
+def flush_ingest_buffer():
+    """Flush rows still buffered by /ingest before the worker exits."""
+    ingest_buffer.close()
+
+def _parse_and_validate_ingest(body: bytes, content_type: str) -> "pd.DataFrame":
+    df = parse_records(body, content_type, ParquetFileLoadDataSchema)
+    return to_sensor_data(validate_frame(df, ParquetFileLoadDataSchema))
+
+@router.post("/ingest", status_code=status.HTTP_202_ACCEPTED)
+async def ingest(
+    request: Request,
+    x_api_key: str = Header(None),
+    username: str = Depends(get_current_user)
+):
+    """
+    Secure API to push sensor readings continuously.
+
+    Accepts NDJSON (`application/x-ndjson`, one `ParquetFileLoadDataSchema` object per line) or an Arrow IPC
+    stream (`application/vnd.apache.arrow.stream`). Rows are buffered and written to PostgreSQL in micro-batches;
+    a 429 response means the buffer is full and the request should be retried later, a 413 that the payload
+    has more rows than the buffer holds.
+    """
+    if not x_api_key or x_api_key != API_SECRET_KEY:
+        raise HTTPException(status_code=401, detail="Unauthorized: Invalid API Key")
+
+    body = await request.body()
+    if not body:
+        raise HTTPException(status_code=400, detail="Empty payload.")
+
+    try:
+        df = await run_in_threadpool(in_sampled_thread(_parse_and_validate_ingest), body, request.headers.get("content-type", ""))
+    except IngestValidationError as e:
+        INGEST_ROWS.inc(outcome="invalid")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if len(df) > ingest_buffer.max_rows:
+        INGEST_ROWS.inc(len(df), outcome="rejected")
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Payload has {len(df)} rows, more than the ingest buffer holds ({ingest_buffer.max_rows}); split it.",
+        )
+    if not ingest_buffer.offer(df):
+        INGEST_ROWS.inc(len(df), outcome="rejected")
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": "Ingest buffer full, retry later.", "buffered_rows": ingest_buffer.buffered_rows},
+            headers={"Retry-After": str(retry_after_seconds(ingest_buffer))},
+        )
+
+    INGEST_ROWS.inc(len(df), outcome="accepted")
+    return {"accepted": len(df), "buffered_rows": ingest_buffer.buffered_rows}
+
 @router.post("/upload-parquet", status_code=status.HTTP_201_CREATED)
 async def upload_parquet(
     x_api_key: str = Header(None),
@@ -0,0 +1,208 @@
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli  # Optional: enables "br" content encoding
+except ImportError:  # pragma: no cover - brotli is an optional dependency
+    brotli = None
+
+# Encodings in order of preference when the client accepts more than one
+SUPPORTED_ENCODINGS: list[str] = ["br", "gzip"]
+DEFAULT_MIN_SIZE: int = 1024
+DEFAULT_GZIP_LEVEL: int = 6
+DEFAULT_BROTLI_QUALITY: int = 4
+
+# Content types that are already compressed or must be flushed as-is
+UNCOMPRESSIBLE_CONTENT_TYPES: tuple[str, ...] = (
+    "text/event-stream",
+    "application/vnd.apache.parquet",
+    "application/x-parquet",
+    "image/",
+    "application/zip",
+    "application/gzip",
+)
+
+def _env_list(name: str, default: str = "") -> list[str]:
+    """Read a comma-separated list from an environment variable."""
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+class _Compressor:
+    """Incremental compressor wrapping gzip (zlib) or brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31 -> gzip container
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing HTTP responses with brotli or gzip.
+
+    The encoding is negotiated from the request `Accept-Encoding` header. Responses smaller
+    than `minimum_size`, responses that already carry a `Content-Encoding`, uncompressible
+    content types and excluded paths are sent untouched. Streaming responses are
+    compressed chunk by chunk, so memory use stays bounded.
+
+    Args:
+        app (ASGIApp): Wrapped application.
+        encodings (list[str]): Enabled encodings ("br", "gzip").
+        minimum_size (int): Minimum body size, in bytes, before compressing.
+        exclude_paths (list[str]): Path prefixes that must never be compressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        encodings: Optional[list[str]] = None,
+        minimum_size: int = DEFAULT_MIN_SIZE,
+        exclude_paths: Optional[list[str]] = None,
+        gzip_level: int = DEFAULT_GZIP_LEVEL,
+        brotli_quality: int = DEFAULT_BROTLI_QUALITY,
+    ):
+        self.app = app
+        encodings = encodings if encodings is not None else SUPPORTED_ENCODINGS
+        self.encodings = [
+            enc for enc in SUPPORTED_ENCODINGS
+            if enc in encodings and (enc != "br" or brotli is not None)
+        ]
+        self.minimum_size = minimum_size
+        self.exclude_paths = tuple(exclude_paths or [])
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _negotiate(self, accept_encoding: str) -> Optional[str]:
+        """Pick the preferred enabled encoding accepted by the client."""
+        accepted: set[str] = set()
+        for part in accept_encoding.split(","):
+            token, _, params = part.strip().partition(";")
+            if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+                continue
+            accepted.add(token.strip().lower())
+        for encoding in self.encodings:
+            if encoding in accepted or "*" in accepted:
+                return encoding
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        path: str = scope.get("path", "")
+        if self.exclude_paths and path.startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+class _CompressionResponder:
+    """Per-request send wrapper deciding whether and how to compress the body."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _is_compressible(self, headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return not content_type.startswith(UNCOMPRESSIBLE_CONTENT_TYPES)
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            self.passthrough = not self._is_compressible(MutableHeaders(raw=message["headers"]))
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if self.start_message is not None:
+                await self.send(self.start_message)
+                self.start_message = None
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+
+        if self.start_message is not None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Small, complete response: not worth compressing
+                self.passthrough = True
+                await self.send(self.start_message)
+                self.start_message = None
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                self.start_message = None
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming response: length is unknown upfront
+            del headers["Content-Length"]
+            await self.send(self.start_message)
+            self.start_message = None
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+def compression_settings_from_env() -> dict:
+    """
+    Build CompressionMiddleware keyword arguments from environment variables.
+
+    API_COMPRESSION: enabled encodings, comma-separated ("br,gzip"), or "off".
+    API_COMPRESSION_MIN_SIZE: minimum response size in bytes.
+    API_COMPRESSION_EXCLUDE: comma-separated path prefixes never compressed.
+    """
+    encodings = _env_list("API_COMPRESSION", ",".join(SUPPORTED_ENCODINGS))
+    if [enc.lower() for enc in encodings] == ["off"]:
+        encodings = []
+
+    return {
+        "encodings": [enc.lower() for enc in encodings],
+        "minimum_size": int(os.getenv("API_COMPRESSION_MIN_SIZE", str(DEFAULT_MIN_SIZE))),
+        "exclude_paths": _env_list("API_COMPRESSION_EXCLUDE"),
+        "gzip_level": int(os.getenv("API_COMPRESSION_GZIP_LEVEL", str(DEFAULT_GZIP_LEVEL))),
+        "brotli_quality": int(os.getenv("API_COMPRESSION_BROTLI_QUALITY", str(DEFAULT_BROTLI_QUALITY))),
+    }
@@ -1,4 +1,13 @@
 #!/bin/sh
 
+# API_RUN_MODE:
+#   development (default) - single uvicorn process
+#   production            - gunicorn master with API_WORKERS uvicorn workers and a preloaded app
+#                           (send SIGHUP to the master for a graceful worker reload)
+if [ "$API_RUN_MODE" = "production" ]; then
+    echo "Starting FastAPI server (production mode, ${API_WORKERS:-auto} workers)..."
+    exec gunicorn -c /app/api/gunicorn.conf.py api.api:app
+fi
+
 echo "Starting FastAPI server..."
 exec uvicorn api.api:app --host 0.0.0.0 --port "$API_PORT"
@@ -0,0 +1,38 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator
+
+from starlette.requests import Request
+
+from db.events import DataEventBroker
+
+SSE_EVENT_NAME: str = "data-version"
+
+def format_sse(event: dict) -> str:
+    """Formats a data event as a Server-Sent Events message (the version doubles as the event id)."""
+    return f"id: {event.get('version', '')}\nevent: {SSE_EVENT_NAME}\ndata: {json.dumps(event)}\n\n"
+
+async def event_stream(request: Request, broker: DataEventBroker) -> AsyncIterator[str]:
+    """
+    Streams data-version events to one client until it disconnects.
+
+    The current version of every kind is sent first, then each new event as it is published;
+    a comment line is sent every EVENTS_HEARTBEAT_SECONDS so proxies keep the connection open.
+    """
+    heartbeat = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    queue = broker.subscribe(asyncio.get_running_loop())
+    try:
+        yield "retry: 5000\n\n"
+        for event in list(broker.latest.values()):
+            yield format_sse(event)
+
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        broker.unsubscribe(queue)
@@ -0,0 +1,40 @@
+"""
+Gunicorn configuration for the production (multi-worker) run mode.
+
+Used by `api/entrypoint.sh` when `API_RUN_MODE=production`:
+    gunicorn -c api/gunicorn.conf.py api.api:app
+
+Environment variables:
+    API_PORT: Port to bind to.
+    API_WORKERS: Number of worker processes (default: number of CPU cores).
+    API_WORKER_TIMEOUT: Seconds before a silent worker is killed and restarted.
+    API_GRACEFUL_TIMEOUT: Seconds workers get to finish in-flight requests on reload/shutdown.
+    API_MAX_REQUESTS: Recycle a worker after this many requests (0 disables it).
+"""
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('API_PORT', '8000')}"
+# An empty API_WORKERS (as in .env.example) means the default
+workers = int(os.getenv("API_WORKERS") or 0) or multiprocessing.cpu_count()
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Import the app (pandas, SQLAlchemy, bcrypt...) once in the master and share it with the
+# workers through copy-on-write, instead of paying the import cost in every worker.
+preload_app = True
+
+timeout = int(os.getenv("API_WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("API_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("API_KEEPALIVE", "5"))
+max_requests = int(os.getenv("API_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+def post_fork(server, worker):
+    """Give each worker its own database engine and connection pool (shared-nothing)."""
+    from db.utils import dispose_db_engines
+
+    dispose_db_engines()
+    server.log.info(f"Worker {worker.pid} started with a fresh database engine.")
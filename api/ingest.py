@@ -0,0 +1,383 @@
+import io
+import math
+import os
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, List, Optional, Type
+
+from pydantic import BaseModel
+
+from db.load_data import COLUMN_MAPPING, DATA_DIR, TABLE_NAME
+from db.metrics import counter, gauge, StageTimer
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+NDJSON_CONTENT_TYPES: tuple[str, ...] = ("application/x-ndjson", "application/jsonl", "application/json")
+ARROW_CONTENT_TYPES: tuple[str, ...] = ("application/vnd.apache.arrow.stream",)
+
+INSIGHTS_REFRESH_LOCK: str = "greenflow_ingest_insights_refresh"
+
+INGEST_ROWS = counter("greenflow_ingest_rows_total", "Rows received by /ingest by outcome.", ("outcome",))
+INGEST_BUFFERED_ROWS = gauge("greenflow_ingest_buffered_rows", "Rows waiting in the ingest buffer.")
+
+class IngestValidationError(ValueError):
+    """Raised when an ingest payload cannot be parsed or does not match the schema."""
+
+def parse_records(body: bytes, content_type: str, schema: Type[BaseModel]) -> "pd.DataFrame":
+    """
+    Parses an NDJSON or Arrow IPC stream payload into a DataFrame with the schema fields.
+
+    Args:
+        body (bytes): Raw request body.
+        content_type (str): Request content type.
+        schema (Type[BaseModel]): Pydantic model describing the expected fields (e.g. ParquetFileLoadDataSchema).
+
+    Returns:
+        pd.DataFrame: Parsed records (schema column names).
+
+    Raises:
+        IngestValidationError: If the payload is malformed or the content type is not supported.
+    """
+    import pyarrow as pa
+
+    media_type = content_type.split(";")[0].strip().lower()
+    try:
+        if media_type in ARROW_CONTENT_TYPES:
+            table = pa.ipc.open_stream(pa.BufferReader(body)).read_all()
+        elif media_type in NDJSON_CONTENT_TYPES or not media_type:
+            import pyarrow.json as pa_json
+
+            arrow_types = {str: pa.string(), float: pa.float64(), int: pa.int64()}
+            explicit_schema = pa.schema([
+                (name, arrow_types.get(field.annotation, pa.string()))
+                for name, field in schema.model_fields.items()
+            ])
+            table = pa_json.read_json(
+                io.BytesIO(body),
+                parse_options=pa_json.ParseOptions(explicit_schema=explicit_schema, unexpected_field_behavior="ignore"),
+            )
+        else:
+            raise IngestValidationError(f"Unsupported content type: {content_type}")
+    except (pa.ArrowInvalid, pa.ArrowTypeError, OSError) as e:
+        raise IngestValidationError(f"Malformed payload: {e}")
+
+    return table.to_pandas()
+
+def _max_length(field) -> Optional[int]:
+    """`max_length` constraint of a Pydantic field (e.g. `Field(max_length=255)`), if any."""
+    return next((meta.max_length for meta in field.metadata if getattr(meta, "max_length", None) is not None), None)
+
+def validate_frame(df: "pd.DataFrame", schema: Type[BaseModel]) -> "pd.DataFrame":
+    """
+    Validates records column-wise (vectorized) against the fields of a Pydantic model.
+
+    String fields must be present, non-empty and within their `max_length`; float fields must be finite numbers.
+
+    Returns:
+        pd.DataFrame: Frame restricted to the schema fields, with float fields as float64.
+
+    Raises:
+        IngestValidationError: Listing the first invalid rows of each failing field.
+    """
+    import numpy as np
+    import pandas as pd
+
+    fields = schema.model_fields
+    missing_columns = set(fields) - set(df.columns)
+    if missing_columns:
+        raise IngestValidationError(f"Missing required columns: {missing_columns}")
+
+    df = df[list(fields)].copy()
+    errors: List[str] = []
+    for name, field in fields.items():
+        if field.annotation is float:
+            values = pd.to_numeric(df[name], errors="coerce").astype("float64")
+            invalid = ~np.isfinite(values.to_numpy())
+            df[name] = values
+        else:
+            text = df[name].astype(str)
+            invalid = (df[name].isna() | (text.str.strip() == "")).to_numpy()
+            max_length = _max_length(field)
+            if max_length is not None:
+                too_long = (text.str.len() > max_length).to_numpy()
+                if too_long.any():
+                    rows = np.flatnonzero(too_long)[:5].tolist()
+                    errors.append(f"{name}: {int(too_long.sum())} value(s) longer than {max_length} characters, e.g. rows {rows}")
+
+        if invalid.any():
+            rows = np.flatnonzero(invalid)[:5].tolist()
+            errors.append(f"{name}: {int(invalid.sum())} invalid value(s), e.g. rows {rows}")
+
+    if errors:
+        raise IngestValidationError("Data validation error: " + "; ".join(errors))
+    return df
+
+class MicroBatchBuffer:
+    """
+    Bounded in-memory buffer flushing ingested rows to `sensor_data` in micro-batches.
+
+    A background thread flushes with COPY whenever `flush_rows` rows are buffered or
+    `flush_interval` seconds have elapsed since the last flush. `offer` refuses new rows
+    once `max_rows` are buffered, so callers can apply backpressure (HTTP 429). Payloads that
+    still cannot be written after `max_retries` flushes are set aside in `failed_dir`.
+    Insights are recomputed at most every `insights_interval` seconds while data flows in, by a
+    single worker (the one holding the insights-refresh advisory lock), never on shutdown.
+    """
+
+    def __init__(
+        self,
+        max_rows: int,
+        flush_rows: int,
+        flush_interval: float,
+        insights_interval: float,
+        max_retries: int = 3,
+        failed_dir: str = os.path.join(DATA_DIR, "ingest_failed"),
+    ):
+        self.max_rows = max_rows
+        self.max_retries = max(max_retries, 1)
+        self.failed_dir = failed_dir
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.insights_interval = insights_interval
+        self._frames: List["pd.DataFrame"] = []
+        self._rows = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = False
+        self._last_insights = time.monotonic()
+        self._lock_connection = None
+        self._refreshed_watermark: Optional[int] = None
+        self._failures = 0
+
+    @property
+    def buffered_rows(self) -> int:
+        return self._rows
+
+    def _ensure_started(self) -> None:
+        # Started lazily (and again after a fork) so every API worker runs its own flusher
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+
+    def offer(self, df: "pd.DataFrame") -> bool:
+        """
+        Adds validated rows (sensor_data column names) to the buffer.
+
+        Returns:
+            bool: False if the buffer is full and the rows were not accepted.
+        """
+        with self._condition:
+            self._ensure_started()
+            if self._rows + len(df) > self.max_rows:
+                return False
+            self._frames.append(df)
+            self._rows += len(df)
+            INGEST_BUFFERED_ROWS.set(self._rows)
+            if self._rows >= self.flush_rows:
+                self._condition.notify()
+        return True
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            with self._condition:
+                while not self._stopping and self._rows < self.flush_rows:
+                    remaining = self.flush_interval - (time.monotonic() - last_flush)
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(timeout=remaining)
+                stopping = self._stopping
+
+            self.flush()
+            last_flush = time.monotonic()
+            if stopping:
+                return
+            self._maybe_refresh_insights()
+
+    def flush(self) -> int:
+        """
+        Writes every buffered row to the database.
+
+        Rows are kept and retried if the write fails. After `max_retries` failed attempts in a row,
+        each buffered payload is written on its own and the ones that still fail are set aside
+        (see `_set_aside`), so a single bad payload can never block the buffer.
+
+        Returns:
+            int: Number of rows written.
+        """
+        import pandas as pd
+        from db.utils import get_db_engine, copy_dataframe_into_db
+
+        with self._condition:
+            frames, self._frames = self._frames, []
+        if not frames:
+            return 0
+
+        batch = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+        engine = get_db_engine()
+        try:
+            with StageTimer("ingest", "flush", rows=len(batch)):
+                copy_dataframe_into_db(engine, batch, TABLE_NAME)
+        except Exception as e:
+            self._failures += 1
+            if self._failures < self.max_retries:
+                print(f"Error: Failed to flush {len(batch)} ingested rows, will retry "
+                      f"({self._failures}/{self.max_retries}): {e}")
+                with self._condition:
+                    self._frames[:0] = frames  # Kept as separate payloads, ahead of newer ones
+                time.sleep(min(self.flush_interval, 1.0))
+                return 0
+            print(f"Error: Failed to flush {len(batch)} ingested rows {self._failures} times, writing payloads one by one: {e}")
+            return self._flush_each(engine, frames)
+
+        self._failures = 0
+        self._flushed(engine, batch)
+        return len(batch)
+
+    def _flush_each(self, engine, frames: List["pd.DataFrame"]) -> int:
+        import pandas as pd
+        from db.utils import copy_dataframe_into_db
+
+        self._failures = 0
+        written = []
+        for frame in frames:
+            try:
+                copy_dataframe_into_db(engine, frame, TABLE_NAME)
+                written.append(frame)
+            except Exception as e:
+                self._set_aside(frame, e)
+        if not written:
+            return 0
+        batch = pd.concat(written, ignore_index=True)
+        self._flushed(engine, batch)
+        return len(batch)
+
+    def _flushed(self, engine, batch: "pd.DataFrame") -> None:
+        from db.distributions import update_distributions
+
+        with self._condition:
+            self._rows -= len(batch)
+            INGEST_BUFFERED_ROWS.set(self._rows)
+        INGEST_ROWS.inc(len(batch), outcome="flushed")
+
+        try:
+            with StageTimer("ingest", "distributions", rows=len(batch)):
+                update_distributions(engine, batch)
+        except Exception as e:
+            print(f"Error: Failed to update distributions after ingestion: {e}")
+
+    def _set_aside(self, frame: "pd.DataFrame", error: Exception) -> None:
+        """
+        Drops a payload that cannot be written from the buffer, saving it as a Parquet file in
+        `failed_dir` (raw column names, so it can be fixed and loaded again with /load-data/batch).
+        """
+        with self._condition:
+            self._rows -= len(frame)
+            INGEST_BUFFERED_ROWS.set(self._rows)
+        INGEST_ROWS.inc(len(frame), outcome="failed")
+
+        path = os.path.join(self.failed_dir, f"ingest-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}.parquet")
+        try:
+            os.makedirs(self.failed_dir, exist_ok=True)
+            frame.rename(columns={target: source for source, target in COLUMN_MAPPING.items()}).to_parquet(path, index=False)
+            print(f"Error: Set aside {len(frame)} ingested rows that cannot be written, saved to {path}: {error}")
+        except Exception as e:
+            print(f"Error: Dropped {len(frame)} ingested rows that cannot be written ({error}); saving them failed: {e}")
+
+    def _is_refresher(self, engine) -> bool:
+        """
+        True while this worker holds the insights-refresh advisory lock, so that a single API
+        worker (across all processes) recomputes insights. The lock lives as long as the
+        connection holding it: if that worker exits, another flusher takes over.
+        """
+        from sqlalchemy import text
+
+        if self._lock_connection is not None:
+            try:
+                self._lock_connection.execute(text("SELECT 1"))
+                return True
+            except Exception:
+                self._release_refresher()
+
+        connection = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        try:
+            if connection.execute(text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": INSIGHTS_REFRESH_LOCK}).scalar():
+                self._lock_connection = connection
+                return True
+        except Exception as e:
+            print(f"Warning: Could not take the insights refresh lock: {e}")
+        connection.close()
+        return False
+
+    def _release_refresher(self) -> None:
+        if self._lock_connection is not None:
+            try:
+                self._lock_connection.close()  # Ends the session, releasing the advisory lock
+            except Exception:
+                pass
+            self._lock_connection = None
+
+    def _maybe_refresh_insights(self) -> None:
+        """Recomputes insights every `insights_interval` seconds when `sensor_data` grew, on the refresher worker only."""
+        if time.monotonic() - self._last_insights < self.insights_interval:
+            return
+        from sqlalchemy import text
+        from db.utils import get_db_engine
+        from db.events import notify_data_changed
+        from db.process_insights import main as process_insights
+
+        self._last_insights = time.monotonic()
+        engine = get_db_engine()
+        if not self._is_refresher(engine):
+            return
+        try:
+            # Rows flushed by any worker move the high-water mark (primary key index lookup)
+            watermark = self._lock_connection.execute(text(f"SELECT max(id) FROM {TABLE_NAME}")).scalar()
+        except Exception as e:
+            print(f"Error: Could not check {TABLE_NAME} for new rows: {e}")
+            return
+        if watermark == self._refreshed_watermark:
+            return
+
+        # Announced with the insights refresh, not on every flush, to keep dashboards from reloading every second
+        notify_data_changed(engine, "sensor_data")
+        try:
+            process_insights()
+            self._refreshed_watermark = watermark
+        except BaseException as e:  # process_insights exits on failure; keep the flusher alive
+            print(f"Error: Failed to refresh insights after ingestion: {e}")
+
+    def close(self, timeout: float = 30.0) -> None:
+        """Stops the flusher after a final flush (called on API shutdown; insights are not recomputed)."""
+        with self._condition:
+            if self._thread is None or self._pid != os.getpid():
+                return
+            self._stopping = True
+            self._condition.notify()
+        self._thread.join(timeout=timeout)
+        self._release_refresher()
+
+def buffer_from_env() -> MicroBatchBuffer:
+    """Creates the ingest buffer configured by the INGEST_* environment variables."""
+    return MicroBatchBuffer(
+        max_rows=int(os.getenv("INGEST_MAX_BUFFER_ROWS", "500000")),
+        flush_rows=int(os.getenv("INGEST_FLUSH_ROWS", "50000")),
+        flush_interval=float(os.getenv("INGEST_FLUSH_INTERVAL", "1.0")),
+        insights_interval=float(os.getenv("INGEST_INSIGHTS_INTERVAL", "60")),
+        max_retries=int(os.getenv("INGEST_FLUSH_RETRIES", "3")),
+        failed_dir=os.getenv("INGEST_FAILED_DIR", os.path.join(DATA_DIR, "ingest_failed")),
+    )
+
+def to_sensor_data(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Renames validated raw fields (empresa, setor...) to the `sensor_data` columns."""
+    return df.rename(columns=COLUMN_MAPPING)[list(COLUMN_MAPPING.values())]
+
+def retry_after_seconds(buffer: MicroBatchBuffer) -> int:
+    """Suggested Retry-After when the buffer is full."""
+    return max(1, math.ceil(buffer.flush_interval))
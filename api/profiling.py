@@ -0,0 +1,327 @@
+import asyncio
+import functools
+import os
+import random
+import sys
+import sysconfig
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Deque, Iterable, Iterator, List, Mapping, Optional
+
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+IDLE_MODULES: tuple[str, ...] = ("threading.py", "queue.py", "selectors.py")
+STDLIB_PATH: str = sysconfig.get_paths()["stdlib"]
+
+# Where the time goes, by the innermost frame of a known package (first match wins)
+CATEGORIES: list[tuple[str, tuple[str, ...]]] = [
+    ("sql", ("/sqlalchemy/", "/psycopg2/", "/duckdb/")),
+    ("pandas", ("/pandas/", "/numpy/", "/pyarrow/")),
+    ("pydantic", ("/pydantic/", "/pydantic_core/")),
+    ("serialization", ("/json/", "/fastapi/encoders.py", "/starlette/responses.py", "/api/compression.py")),
+]
+
+def profile_sample_rate() -> float:
+    """Fraction of requests profiled automatically (PROFILE_SAMPLE_RATE, 0 = only on demand)."""
+    return float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+def _frame_name(code) -> str:
+    """Frame label as "module.path:function", relative to site-packages or the working directory."""
+    path = code.co_filename
+    if "/site-packages/" in path:
+        path = path.split("/site-packages/", 1)[1]
+    else:
+        for root in (os.getcwd(), STDLIB_PATH):
+            if path.startswith(root + os.sep):
+                path = path[len(root) + 1:]
+                break
+    return f"{path.rsplit('.py', 1)[0].replace('/', '.')}:{code.co_name}"
+
+def _category(frame) -> str:
+    while frame is not None:
+        path = frame.f_code.co_filename
+        for category, markers in CATEGORIES:
+            if any(marker in path for marker in markers):
+                return category
+        frame = frame.f_back
+    return "app"
+
+# Profiler of the request being served; copied into the worker threads that run its sync code
+_ACTIVE_PROFILER: ContextVar[Optional["SamplingProfiler"]] = ContextVar("active_profiler", default=None)
+
+class SamplingProfiler:
+    """
+    Wall-clock sampling profiler for one request, fed by `sys._current_frames()`.
+
+    A background thread records, every `interval` seconds, the stacks of the event loop thread
+    (async endpoints, middlewares, serialization) and of the worker threads currently running
+    this request's sync code (see `sampled_thread`), as folded stacks ("root;...;leaf" -> samples),
+    the input of flame graph tools (flamegraph.pl, speedscope). Idle threads are not sampled.
+    The event loop is shared by every request of the worker, so `concurrent_requests` records
+    how many requests were in flight at most while sampling. Sampling stops after `max_duration`
+    seconds (0 = no limit), with `truncated` set, so a long-lived stream cannot grow a profile forever.
+    """
+
+    def __init__(self, interval: float = 0.005, in_flight: Callable[[], int] = lambda: 1, max_duration: float = 0.0):
+        self.id = uuid.uuid4().hex[:12]
+        self.interval = interval
+        self.max_duration = max_duration
+        self.truncated = False
+        self.stacks: Counter = Counter()
+        self.categories: Counter = Counter()
+        self.samples = 0
+        self.concurrent_requests = in_flight()
+        self._in_flight = in_flight
+        self._loop_thread = threading.get_ident()
+        self._request_threads: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def add_thread(self, thread_id: int) -> None:
+        with self._lock:
+            self._request_threads[thread_id] += 1
+
+    def remove_thread(self, thread_id: int) -> None:
+        with self._lock:
+            self._request_threads[thread_id] -= 1
+            if self._request_threads[thread_id] <= 0:
+                del self._request_threads[thread_id]
+
+    def _sampled_threads(self) -> set:
+        with self._lock:
+            return {self._loop_thread, *self._request_threads}
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_duration
+        while not self._stop.wait(self.interval):
+            if self.max_duration and time.monotonic() >= deadline:
+                self.truncated = True
+                return
+            self.concurrent_requests = max(self.concurrent_requests, self._in_flight())
+            threads = self._sampled_threads()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in threads or frame.f_code.co_filename.endswith(IDLE_MODULES):
+                    continue
+                names = []
+                leaf = frame
+                while frame is not None:
+                    names.append(_frame_name(frame.f_code))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(names))] += 1
+                self.categories[_category(leaf)] += 1
+                self.samples += 1
+
+@contextmanager
+def sampled_thread() -> Iterator[None]:
+    """Samples the calling thread into the current request's profile, if the request is profiled."""
+    profiler = _ACTIVE_PROFILER.get()
+    if profiler is None:
+        yield
+        return
+    thread_id = threading.get_ident()
+    profiler.add_thread(thread_id)
+    try:
+        yield
+    finally:
+        profiler.remove_thread(thread_id)
+
+def in_sampled_thread(func: Callable) -> Callable:
+    """Wraps a function handed to the threadpool so that its worker thread is sampled (see `sampled_thread`)."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with sampled_thread():
+            return func(*args, **kwargs)
+    return wrapper
+
+def sampled_iter(iterable: Iterable) -> Iterator:
+    """
+    Wraps a sync iterable streamed by a `StreamingResponse`, so that the worker threads pulling
+    its items are sampled into the profile of the request that created it.
+    """
+    iterator = iter(iterable)
+    profiler = _ACTIVE_PROFILER.get()
+    if profiler is None:
+        return iterator
+
+    def items():
+        while True:
+            thread_id = threading.get_ident()
+            profiler.add_thread(thread_id)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                profiler.remove_thread(thread_id)
+            yield item
+    return items()
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose sync endpoints run in a sampled worker thread when the request is profiled."""
+
+    def get_route_handler(self) -> Callable:
+        if not asyncio.iscoroutinefunction(self.dependant.call):
+            self.dependant.call = in_sampled_thread(self.dependant.call)
+        return super().get_route_handler()
+
+class ProfileStore:
+    """Ring buffer of the last `keep` request profiles of this worker."""
+
+    def __init__(self, keep: int = 20):
+        self._profiles: Deque[dict] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def add(self, profiler: SamplingProfiler, method: str, path: str, status: int, duration: float, trigger: str) -> dict:
+        samples = max(profiler.samples, 1)
+        profile = {
+            "id": profiler.id,
+            "captured_at": time.time(),
+            "method": method,
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration * 1000, 2),
+            "trigger": trigger,
+            "interval_ms": profiler.interval * 1000,
+            "samples": profiler.samples,
+            "truncated": profiler.truncated,
+            # Requests in flight in this worker while sampling (this one included): above 1, the
+            # event loop samples may include work of the other requests
+            "concurrent_requests": profiler.concurrent_requests,
+            # Share of the sampled time spent in SQL, pandas, Pydantic, serialization or app code
+            "categories": {name: round(count / samples, 3) for name, count in profiler.categories.most_common()},
+            "stacks": dict(profiler.stacks),
+        }
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def list(self) -> List[dict]:
+        """Profiles without their stacks, newest first."""
+        with self._lock:
+            profiles = list(reversed(self._profiles))
+        return [{key: value for key, value in profile.items() if key != "stacks"} for profile in profiles]
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return next((profile for profile in self._profiles if profile["id"] == profile_id), None)
+
+def folded_stacks(profile: dict) -> str:
+    """Folded-stack text of a profile ("frame;frame;frame count" per line)."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(profile["stacks"].items()))
+
+def profile_trigger(headers: Mapping[str, str], api_key: Optional[str]) -> Optional[str]:
+    """
+    Decides whether a request is profiled.
+
+    Returns:
+        Optional[str]: "header" when an admin asked for it (`x-profile: 1` with the API key),
+        "sample" when picked by PROFILE_SAMPLE_RATE, None otherwise.
+    """
+    if headers.get("x-profile") == "1" and api_key and headers.get("x-api-key") == api_key:
+        return "header"
+    rate = profile_sample_rate()
+    if rate > 0 and random.random() < rate:
+        return "sample"
+    return None
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware running the requests picked by `profile_trigger` under a `SamplingProfiler`.
+
+    The profiler runs until the last body chunk is sent, so the body of streaming responses
+    (/export) is profiled too; the profile id is sent in the `X-Profile-Id` header and the profile
+    is added to `store` once the response is complete, or once `max_duration` is reached (at the
+    next chunk sent). Paths in `exclude_paths` (long-lived streams such as /events) are never picked
+    by PROFILE_SAMPLE_RATE, only on demand. The middleware also counts the requests in flight,
+    recorded as `concurrent_requests` in the profiles.
+
+    Args:
+        app (ASGIApp): Wrapped application.
+        store (ProfileStore): Where the profiles are kept.
+        interval (float): Sampling interval, in seconds.
+        api_key (Optional[str]): API key required with the `x-profile: 1` header.
+        max_duration (float): Longest sampled time per profile, in seconds (0 = no limit).
+        exclude_paths (list[str]): Path prefixes never profiled by sampling.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        interval: float = 0.005,
+        api_key: Optional[str] = None,
+        max_duration: float = 0.0,
+        exclude_paths: Optional[list[str]] = None,
+    ):
+        self.app = app
+        self.store = store
+        self.interval = interval
+        self.api_key = api_key
+        self.max_duration = max_duration
+        self.exclude_paths = tuple(exclude_paths or [])
+        self.in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            trigger = profile_trigger(Headers(scope=scope), self.api_key)
+            if trigger == "sample" and self.exclude_paths and scope["path"].startswith(self.exclude_paths):
+                trigger = None
+            if trigger is None:
+                await self.app(scope, receive, send)
+            else:
+                await self._profile(scope, receive, send, trigger)
+        finally:
+            self.in_flight -= 1
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send, trigger: str) -> None:
+        profiler = SamplingProfiler(self.interval, lambda: self.in_flight, self.max_duration).start()
+        token = _ACTIVE_PROFILER.set(profiler)
+        start = time.perf_counter()
+        status_code = 500
+        stored = False
+
+        def store() -> None:
+            nonlocal stored
+            stored = True
+            profiler.stop()
+            route = scope.get("route")
+            self.store.add(
+                profiler, scope["method"], getattr(route, "path", scope["path"]), status_code,
+                time.perf_counter() - start, trigger,
+            )
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = profiler.id
+            await send(message)
+            if profiler.truncated and not stored:
+                store()
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            _ACTIVE_PROFILER.reset(token)
+            if not stored:
+                store()
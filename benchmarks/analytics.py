@@ -0,0 +1,107 @@
+"""
+Compares the analytic read paths: embedded DuckDB over the Parquet snapshot vs PostgreSQL.
+
+Usage:
+    python -m benchmarks.analytics --rows 100000,1000000 [--repeat 5] [--allow-db-writes] [--output results.json]
+
+For each dataset size a synthetic dataset is generated (see `benchmarks.generate`), written as
+the analytics snapshot, and the sector aggregation, top-N and distribution queries are timed on
+DuckDB. With --allow-db-writes the same rows are loaded into `sensor_data` of the configured
+database (REPLACING it, use a local database) and the equivalent SQL is timed on PostgreSQL.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.generate import generate_parquet
+from benchmarks.run import bench, git_commit
+
+# (name, DuckDB query, equivalent PostgreSQL query)
+QUERIES: list[tuple[str, str, str]] = [
+    (
+        "insights",
+        "SELECT sector, avg(energy_kwh), avg(water_m3), avg(co2_emissions) FROM {source} GROUP BY sector",
+        "SELECT sector, avg(energy_kwh), avg(water_m3), avg(co2_emissions) FROM sensor_data GROUP BY sector",
+    ),
+    (
+        "leaderboard_top10",
+        "SELECT company, sector, co2_emissions FROM {source} ORDER BY co2_emissions DESC, company LIMIT 10",
+        "SELECT company, sector, co2_emissions FROM sensor_data ORDER BY co2_emissions DESC, company LIMIT 10",
+    ),
+    (
+        "sector_leaderboard_top10",
+        "SELECT company, co2_emissions FROM {source} WHERE sector = 'Varejo' ORDER BY co2_emissions DESC, company LIMIT 10",
+        "SELECT company, co2_emissions FROM sensor_data WHERE sector = 'Varejo' ORDER BY co2_emissions DESC, company LIMIT 10",
+    ),
+    (
+        "quantiles",
+        "SELECT quantile_cont(energy_kwh, [0.25, 0.5, 0.75, 0.95]) FROM {source}",
+        "SELECT percentile_cont(ARRAY[0.25, 0.5, 0.75, 0.95]) WITHIN GROUP (ORDER BY energy_kwh) FROM sensor_data",
+    ),
+]
+
+def run_duckdb_benchmarks(snapshot: str, rows: int, repeat: int) -> list[dict]:
+    """Times every query on the embedded DuckDB engine, reading the Parquet snapshot."""
+    os.environ["ANALYTICS_SNAPSHOT_PATH"] = snapshot
+    from db.analytics import get_cursor, snapshot_source
+
+    cursor = get_cursor()
+    return [
+        bench(f"duckdb_{name}", lambda sql=sql: cursor.execute(sql.format(source=snapshot_source())).fetchall(), rows, repeat)
+        for name, sql, _ in QUERIES
+    ]
+
+def run_postgres_benchmarks(df, rows: int, repeat: int) -> list[dict]:
+    """Loads the rows into `sensor_data` and times the equivalent queries on PostgreSQL."""
+    from sqlalchemy import text
+    from db.load_data import TABLE_NAME
+    from db.utils import get_db_engine, insert_data_into_db
+
+    engine = get_db_engine()
+    insert_data_into_db(engine, df, TABLE_NAME)
+    with engine.begin() as conn:
+        conn.execute(text(f"ANALYZE {TABLE_NAME}"))
+
+    def query(sql: str) -> None:
+        with engine.connect() as conn:
+            conn.execute(text(sql)).fetchall()
+
+    return [bench(f"postgres_{name}", lambda sql=sql: query(sql), rows, repeat) for name, _, sql in QUERIES]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="100000,1000000", help="Comma-separated dataset sizes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "greenflow-benchmarks"))
+    parser.add_argument("--allow-db-writes", action="store_true",
+                        help="Also benchmark PostgreSQL (replaces sensor_data)")
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    from db.analytics import write_snapshot
+    from db.load_data import COLUMN_MAPPING
+    from db.utils import load_parquet_data
+
+    results = []
+    for rows in [int(size) for size in args.rows.split(",") if size]:
+        path = os.path.join(args.data_dir, f"sensors_{rows}_{rows}_0.0_0.0_{args.seed}.parquet")
+        if not os.path.exists(path):
+            print(f"Generating {rows} rows into {path}...")
+            generate_parquet(path, rows, seed=args.seed)
+
+        df = load_parquet_data(path, COLUMN_MAPPING)
+        snapshot = write_snapshot(df, os.path.join(args.data_dir, f"analytics_{rows}.parquet"))
+        results.extend(run_duckdb_benchmarks(snapshot, rows, args.repeat))
+        if args.allow_db_writes:
+            results.extend(run_postgres_benchmarks(df, rows, args.repeat))
+
+    output = json.dumps({"commit": git_commit(), "cpu_count": os.cpu_count(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
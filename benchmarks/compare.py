@@ -0,0 +1,46 @@
+"""
+Compares two benchmark result files produced by `benchmarks.run`.
+
+Usage:
+    python -m benchmarks.compare baseline.json current.json [--threshold 0.10]
+
+Prints the median time change of every benchmark present in both files and exits with
+code 1 when any benchmark is slower than the baseline by more than `threshold`.
+"""
+import argparse
+import json
+import sys
+
+def load_results(path: str) -> dict[tuple[str, int], dict]:
+    """Index the results of a benchmark file by (name, rows)."""
+    with open(path) as f:
+        data = json.load(f)
+    return {(result["name"], result["rows"]): result for result in data["results"]}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown ratio (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+
+    regressions = []
+    print(f"{'benchmark':<32} {'rows':>10} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for key in sorted(baseline.keys() & current.keys()):
+        before = baseline[key]["median_s"] * 1000
+        after = current[key]["median_s"] * 1000
+        change = (after - before) / before if before > 0 else 0.0
+        flag = " !" if change > args.threshold else ""
+        print(f"{key[0]:<32} {key[1]:>10} {before:>12.2f} {after:>12.2f} {change:>+7.1%}{flag}")
+        if change > args.threshold:
+            regressions.append(key)
+
+    if regressions:
+        print(f"Error: {len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}.", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Deterministic synthetic sensor-data generator.
+
+Writes Parquet files with the raw sensor schema (`empresa`, `energia_kwh`, `agua_m3`,
+`co2_emissoes`, `setor`), with value ranges matching `data/dados_sensores_5000.parquet`.
+The same arguments and seed always produce the same file.
+
+Usage:
+    python -m benchmarks.generate --rows 1000000 --output data/synthetic_1m.parquet \
+        [--companies 50000] [--company-skew 1.1] [--sector-skew 0.8] [--seed 42]
+
+Skew parameters are Zipf exponents: 0 gives a uniform distribution, larger values
+concentrate rows on fewer sectors/companies.
+"""
+import argparse
+import os
+from typing import Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SECTORS: list[str] = ["Indústria", "Varejo", "Saúde", "Alimentação", "Serviços", "Educação"]
+
+# (low, high) uniform ranges observed in the reference dataset
+VALUE_RANGES: dict[str, tuple[float, float]] = {
+    "energia_kwh": (100.0, 10000.0),
+    "agua_m3": (10.0, 500.0),
+    "co2_emissoes": (50.0, 3000.0),
+}
+
+SCHEMA = pa.schema([
+    ("empresa", pa.string()),
+    ("energia_kwh", pa.float64()),
+    ("agua_m3", pa.float64()),
+    ("co2_emissoes", pa.float64()),
+    ("setor", pa.string()),
+])
+
+DEFAULT_CHUNK_ROWS: int = 1_000_000
+
+def zipf_weights(n: int, skew: float) -> np.ndarray:
+    """Normalized Zipf weights for `n` items (uniform when skew is 0)."""
+    ranks = np.arange(1, n + 1, dtype=np.float64)
+    weights = 1.0 / np.power(ranks, skew)
+    return weights / weights.sum()
+
+def generate_parquet(
+    output_path: str,
+    rows: int,
+    companies: Optional[int] = None,
+    company_skew: float = 0.0,
+    sector_skew: float = 0.0,
+    seed: int = 42,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> str:
+    """
+    Generates a synthetic sensor-data Parquet file, streaming it in row groups of `chunk_rows`.
+
+    Args:
+        output_path (str): Destination Parquet file.
+        rows (int): Number of rows.
+        companies (Optional[int]): Number of distinct companies (default: one per row, like the reference data).
+        company_skew (float): Zipf exponent of the readings per company (only when companies < rows).
+        sector_skew (float): Zipf exponent of the companies per sector.
+        seed (int): Random seed.
+        chunk_rows (int): Rows generated and written per row group.
+
+    Returns:
+        str: The output path.
+    """
+    companies = companies or rows
+    rng = np.random.default_rng(seed)
+
+    # Each company belongs to exactly one sector
+    company_sector = rng.choice(len(SECTORS), size=companies, p=zipf_weights(len(SECTORS), sector_skew))
+    company_weights = zipf_weights(companies, company_skew) if companies < rows else None
+    sectors = np.array(SECTORS, dtype=object)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with pq.ParquetWriter(output_path, SCHEMA) as writer:
+        for start in range(0, rows, chunk_rows):
+            size = min(chunk_rows, rows - start)
+            if company_weights is None:
+                company_ids = np.arange(start, start + size) % companies
+            else:
+                company_ids = rng.choice(companies, size=size, p=company_weights)
+
+            columns = {
+                "empresa": pa.array(np.char.add("Empresa_", (company_ids + 1).astype(str)).astype(object)),
+                "setor": pa.array(sectors[company_sector[company_ids]]),
+            }
+            for column, (low, high) in VALUE_RANGES.items():
+                columns[column] = pa.array(np.round(rng.uniform(low, high, size=size), 2))
+
+            writer.write_table(pa.table({name: columns[name] for name in SCHEMA.names}, schema=SCHEMA))
+
+    return output_path
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--companies", type=int, default=None)
+    parser.add_argument("--company-skew", type=float, default=0.0)
+    parser.add_argument("--sector-skew", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    path = generate_parquet(args.output, args.rows, args.companies, args.company_skew,
+                            args.sector_skew, args.seed, args.chunk_rows)
+    print(f"Generated {args.rows} rows into {path}")
+
+if __name__ == "__main__":
+    main()
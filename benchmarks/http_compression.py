@@ -0,0 +1,101 @@
+"""
+Measures bytes-on-wire and latency of the API read endpoints per content encoding.
+
+Usage:
+    python -m benchmarks.http_compression --base-url http://localhost:8000/api/v1 \
+        --username user --password password [--repeat 20] [--output results.json]
+
+Each endpoint is requested with `Accept-Encoding: identity` (baseline), `gzip` and `br`,
+over a fresh connection and over a kept-alive session, and the results are printed as JSON.
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+
+import requests
+
+ENDPOINTS: list[tuple[str, dict]] = [
+    ("/insights", {}),
+    ("/sectors", {}),
+    ("/sensor-data", {"limit": 1000}),
+    ("/companies", {"page": 1, "page_size": 500}),
+    ("/companies", {"page": 1, "page_size": 5000, "order_by": "co2_emissions", "order_dir": "desc"}),
+]
+ENCODINGS: list[str] = ["identity", "gzip", "br"]
+
+def decoded_size(raw: bytes, content_encoding: str) -> int:
+    """Size of the response body once decoded."""
+    if content_encoding == "gzip":
+        return len(gzip.decompress(raw))
+    if content_encoding == "br":
+        import brotli
+        return len(brotli.decompress(raw))
+    return len(raw)
+
+def login(base_url: str, username: str, password: str) -> str:
+    """Authenticate against the API and return a JWT token."""
+    response = requests.post(f"{base_url}/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["token"]
+
+def measure(session_factory, url: str, params: dict, headers: dict, repeat: int) -> dict:
+    """Request `url` `repeat` times and collect wire size and latency."""
+    latencies: list[float] = []
+    wire_bytes = 0
+    content_encoding = "identity"
+    for _ in range(repeat):
+        session = session_factory()
+        start = time.perf_counter()
+        response = session.get(url, params=params, headers=headers, stream=True)
+        raw = response.raw.read(decode_content=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        wire_bytes = len(raw)
+        content_encoding = response.headers.get("Content-Encoding", "identity")
+        response.close()
+
+    latencies.sort()
+    return {
+        "content_encoding": content_encoding,
+        "wire_bytes": wire_bytes,
+        "decoded_bytes": decoded_size(raw, content_encoding),
+        "latency_ms_p50": round(statistics.median(latencies), 2),
+        "latency_ms_p95": round(latencies[int(len(latencies) * 0.95) - 1], 2),
+        "latency_ms_mean": round(statistics.fmean(latencies), 2),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.username, args.password)
+    shared_session = requests.Session()
+    connection_modes = {
+        "new_connection": requests.Session,
+        "keep_alive": lambda: shared_session,
+    }
+
+    results = []
+    for path, params in ENDPOINTS:
+        for encoding in ENCODINGS:
+            headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": encoding}
+            for mode, factory in connection_modes.items():
+                result = measure(factory, f"{args.base_url}{path}", params, headers, args.repeat)
+                results.append({"endpoint": path, "params": params, "accept_encoding": encoding,
+                                "connection": mode, **result})
+
+    output = json.dumps({"base_url": args.base_url, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Closed-loop HTTP load test for the API read endpoints.
+
+Usage:
+    python -m benchmarks.load_test --base-url http://localhost:8000/api/v1 \
+        --username user --password password --concurrency 1,2,4,8,16 --duration 15
+
+Run it once per deployment mode (e.g. `API_WORKERS=1`, `2`, `4`...) to see throughput
+scale with the number of workers. Results are printed as JSON.
+
+With `--reload --api-key <API secret key>`, it instead measures reader latency on the read
+endpoints first at rest, then while `/load-data` reloads the default dataset (and recomputes the
+insights). Readers should see no errors and a flat latency during the reload. The default dataset
+is reloaded because `/load-data` deletes an uploaded file once loaded; a reload that does not
+succeed aborts the run, since the latency measured around it would mean nothing.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import requests
+
+ENDPOINTS: list[tuple[str, dict]] = [
+    ("/insights", {}),
+    ("/sectors", {}),
+    ("/sensor-data", {"limit": 100}),
+    ("/companies", {"page": 1, "page_size": 10}),
+]
+# /load-data answers 200 even when the insights could not be recomputed; only this message is a full reload
+RELOAD_SUCCESS: str = "Data successfully loaded"
+
+def login(base_url: str, username: str, password: str) -> str:
+    """Authenticate against the API and return a JWT token."""
+    response = requests.post(f"{base_url}/login", json={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["token"]
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def run_level(url: str, params: dict, headers: dict, concurrency: int, duration: float) -> dict:
+    """Hammer `url` with `concurrency` clients for `duration` seconds."""
+    deadline = time.perf_counter() + duration
+    return run_until(url, params, headers, concurrency, lambda: time.perf_counter() >= deadline)
+
+def run_until(url: str, params: dict, headers: dict, concurrency: int, done: Callable[[], bool]) -> dict:
+    """Hammer `url` with `concurrency` clients until `done()` returns True."""
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def client() -> None:
+        nonlocal errors
+        session = requests.Session()
+        local_latencies: list[float] = []
+        local_errors = 0
+        while not done():
+            start = time.perf_counter()
+            try:
+                response = session.get(url, params=params, headers=headers)
+                if response.status_code != 200:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(local_latencies)
+            errors += local_errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(client)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "latency_ms_p50": round(percentile(latencies, 50), 2),
+        "latency_ms_p95": round(percentile(latencies, 95), 2),
+        "latency_ms_p99": round(percentile(latencies, 99), 2),
+    }
+
+def run_reload(base_url: str, headers: dict, api_key: str, concurrency: int, duration: float) -> list[dict]:
+    """
+    Measures each read endpoint at rest for `duration` seconds, then while `/load-data` reloads the default dataset.
+
+    Returns:
+        list[dict]: One result per endpoint and phase ("baseline" or "reload"), with the reload time.
+    """
+    results = []
+    for path, params in ENDPOINTS:
+        baseline = run_level(f"{base_url}{path}", params, headers, concurrency, duration)
+        results.append({"endpoint": path, "params": params, "phase": "baseline", **baseline})
+
+        reload_done = threading.Event()
+        reload_report: dict = {}
+
+        def reload() -> None:
+            start = time.perf_counter()
+            try:
+                response = requests.post(f"{base_url}/load-data", json={}, headers={**headers, "x-api-key": api_key})
+                reload_report["status"] = response.status_code
+                if response.status_code != 200 or RELOAD_SUCCESS not in response.text:
+                    reload_report["error"] = response.text[:500]
+            except requests.RequestException as e:
+                reload_report["status"] = str(e)
+            finally:
+                reload_report["reload_seconds"] = round(time.perf_counter() - start, 2)
+                reload_done.set()
+
+        loader = threading.Thread(target=reload)
+        loader.start()
+        during = run_until(f"{base_url}{path}", params, headers, concurrency, reload_done.is_set)
+        loader.join()
+        if "error" in reload_report or reload_report["status"] != 200:
+            raise RuntimeError(
+                f"Reload failed during the {path} run (status {reload_report['status']}): "
+                f"{reload_report.get('error', '')}"
+            )
+        results.append({"endpoint": path, "params": params, "phase": "reload", **during, **reload_report})
+        print(
+            f"{path} c={concurrency}: p95 {baseline['latency_ms_p95']} ms at rest, "
+            f"{during['latency_ms_p95']} ms during a {reload_report['reload_seconds']}s reload "
+            f"({during['errors']} errors, load status {reload_report['status']})"
+        )
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--output", default="")
+    parser.add_argument("--reload", action="store_true", help="Measure readers while /load-data reloads the default dataset")
+    parser.add_argument("--api-key", default=os.getenv("API_SECRET_KEY", ""), help="API secret key for /load-data")
+    args = parser.parse_args()
+
+    token = login(args.base_url, args.username, args.password)
+    headers = {"Authorization": f"Bearer {token}"}
+    levels = [int(level) for level in args.concurrency.split(",") if level]
+
+    results = []
+    if args.reload:
+        if not args.api_key:
+            parser.error("--reload requires --api-key (or API_SECRET_KEY)")
+        for concurrency in levels:
+            results.extend(run_reload(args.base_url, headers, args.api_key, concurrency, args.duration))
+    else:
+        for path, params in ENDPOINTS:
+            for concurrency in levels:
+                result = run_level(f"{args.base_url}{path}", params, headers, concurrency, args.duration)
+                results.append({"endpoint": path, "params": params, **result})
+                print(f"{path} c={concurrency}: {result['throughput_rps']} req/s, p95 {result['latency_ms_p95']} ms")
+
+    output = json.dumps({
+        "base_url": args.base_url,
+        "client_cpu_count": os.cpu_count(),
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Reproducible benchmark suite for the ingestion pipeline and the API endpoints.
+
+Usage:
+    python -m benchmarks.run --rows 10000,100000,1000000 --output results.json [--allow-db-writes]
+
+For each dataset size a synthetic Parquet file is generated (see `benchmarks.generate`) and
+the following are timed:
+    - load_parquet_data, validate_parquet and compute_insights (no database needed)
+    - memory footprint of the loaded dataset with default and compact dtypes
+    - insert_data_into_db and every read endpoint through a FastAPI TestClient
+      (only with --allow-db-writes: the `sensor_data` and `insights` tables of the database
+      configured by the POSTGRES_* environment variables are REPLACED, use a local database)
+
+Results are written as JSON; compare two runs with `python -m benchmarks.compare`.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Optional
+
+from benchmarks.generate import generate_parquet
+
+# Dummy secrets so that api.api can be imported by the benchmark process
+os.environ.setdefault("API_SECRET_KEY", "benchmark")
+os.environ.setdefault("API_AUTH_SECRET_KEY", "benchmark")
+
+# (name, path, query parameters) of the API read endpoints to benchmark
+API_ENDPOINTS: list[tuple[str, str, dict]] = [
+    ("api_root", "/api/v1/", {}),
+    ("api_insights", "/api/v1/insights", {}),
+    ("api_sector_insights", "/api/v1/insights/Varejo", {}),
+    ("api_sectors", "/api/v1/sectors", {}),
+    ("api_sensor_data", "/api/v1/sensor-data", {"limit": 100}),
+    ("api_companies", "/api/v1/companies", {"page": 1, "page_size": 10}),
+    ("api_companies_sector_sorted", "/api/v1/companies",
+     {"sector": "Varejo", "page": 2, "page_size": 20, "order_by": "co2_emissions", "order_dir": "desc"}),
+]
+
+def git_commit() -> Optional[str]:
+    """Current git commit of the working tree, if available."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench(name: str, fn: Callable[[], object], rows: int, repeat: int, warmup: int = 1) -> dict:
+    """Time `fn` `repeat` times (after `warmup` untimed runs) and summarize the durations."""
+    for _ in range(warmup):
+        fn()
+    durations: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+
+    median = statistics.median(durations)
+    result = {
+        "name": name,
+        "rows": rows,
+        "repeat": repeat,
+        "min_s": round(min(durations), 6),
+        "median_s": round(median, 6),
+        "mean_s": round(statistics.fmean(durations), 6),
+        "rows_per_s": round(rows / median, 1) if median > 0 else None,
+    }
+    print(f"{name} [{rows} rows]: median {median * 1000:.1f} ms")
+    return result
+
+def run_pipeline_benchmarks(path: str, rows: int, repeat: int, max_validate_rows: int) -> list[dict]:
+    """Benchmarks that only need the Parquet file."""
+    from db.load_data import COLUMN_MAPPING
+    from db.utils import load_parquet_data
+    from db.process_insights import compute_insights
+    from api.api import validate_parquet
+    from pathlib import Path
+
+    results = [bench("load_parquet_data", lambda: load_parquet_data(path, COLUMN_MAPPING), rows, repeat)]
+    if rows <= max_validate_rows:
+        results.append(bench("validate_parquet", lambda: validate_parquet(Path(path)), rows, repeat))
+
+    df = load_parquet_data(path, COLUMN_MAPPING)
+    results.append(bench("compute_insights", lambda: compute_insights(df), rows, repeat))
+    return results
+
+def run_memory_benchmarks(path: str, rows: int) -> list[dict]:
+    """Memory footprint of the loaded dataset with default pandas dtypes vs the compact frame layer."""
+    import pandas as pd
+    from db.load_data import COLUMN_MAPPING
+    from db.utils import load_parquet_data
+    from db.frames import compact_frame, memory_report
+
+    default_df = pd.read_parquet(path).rename(columns=COLUMN_MAPPING)
+    compact_df = load_parquet_data(path, COLUMN_MAPPING)
+    float32_df = compact_frame(compact_df.copy(), float32=True)
+    return [
+        {"name": name, "rows": rows, "bytes": memory_report(df, "benchmark", name)}
+        for name, df in (("default_dtypes", default_df), ("compact", compact_df), ("compact_float32", float32_df))
+    ]
+
+def run_database_benchmarks(path: str, rows: int, repeat: int) -> list[dict]:
+    """Benchmarks writing to and reading from the configured PostgreSQL database."""
+    from fastapi.testclient import TestClient
+    from db.load_data import COLUMN_MAPPING, TABLE_NAME
+    from db.utils import get_db_engine, load_parquet_data, insert_data_into_db
+    from db.process_insights import main as process_insights
+    from api.api import app, create_jwt_token
+
+    engine = get_db_engine()
+    df = load_parquet_data(path, COLUMN_MAPPING)
+    results = [bench("insert_data_into_db", lambda: insert_data_into_db(engine, df, TABLE_NAME), rows, repeat, warmup=0)]
+    process_insights()
+
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_jwt_token('benchmark')}"}
+
+    def call(endpoint: str, params: dict) -> None:
+        response = client.get(endpoint, params=params, headers=headers)
+        response.raise_for_status()
+
+    for name, endpoint, params in API_ENDPOINTS:
+        results.append(bench(name, lambda: call(endpoint, params), rows, repeat))
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,100000", help="Comma-separated dataset sizes")
+    parser.add_argument("--companies", type=int, default=None)
+    parser.add_argument("--company-skew", type=float, default=0.0)
+    parser.add_argument("--sector-skew", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-validate-rows", type=int, default=1_000_000,
+                        help="Skip validate_parquet (row-by-row) above this size")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "greenflow-benchmarks"))
+    parser.add_argument("--allow-db-writes", action="store_true",
+                        help="Run database/API benchmarks (replaces sensor_data and insights)")
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    results = []
+    memory = []
+    for rows in [int(size) for size in args.rows.split(",") if size]:
+        path = os.path.join(
+            args.data_dir,
+            f"sensors_{rows}_{args.companies or rows}_{args.company_skew}_{args.sector_skew}_{args.seed}.parquet",
+        )
+        if not os.path.exists(path):
+            print(f"Generating {rows} rows into {path}...")
+            generate_parquet(path, rows, args.companies, args.company_skew, args.sector_skew, args.seed)
+
+        results.extend(run_pipeline_benchmarks(path, rows, args.repeat, args.max_validate_rows))
+        memory.extend(run_memory_benchmarks(path, rows))
+        if args.allow_db_writes:
+            results.extend(run_database_benchmarks(path, rows, args.repeat))
+
+    output = json.dumps({
+        "commit": git_commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {key: value for key, value in vars(args).items() if key not in ("output", "data_dir")},
+        "results": results,
+        "memory": memory,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Cold-start budget check for the API and the db modules, based on `python -X importtime`.
+
+Usage:
+    python -m benchmarks.startup [--budget-ms 1500] [--repeat 5] [--output results.json]
+
+Each module is imported in a fresh interpreter. The check fails (exit code 1) when the
+median cumulative import time exceeds its budget, or when a heavy module that must stay
+lazy (pandas, bcrypt...) gets imported at startup.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Module -> (budget in ms, modules that must not be imported at startup)
+MODULES: dict[str, tuple[float, list[str]]] = {
+    "api.api": (1500.0, ["pandas", "numpy", "bcrypt", "sqlalchemy", "pyarrow", "duckdb"]),
+    "db.load_data": (600.0, ["pandas", "numpy", "bcrypt", "sqlalchemy", "pyarrow"]),
+    "db.process_insights": (600.0, ["pandas", "numpy", "bcrypt", "sqlalchemy", "pyarrow"]),
+}
+
+# Dummy values so api.api does not exit on missing environment variables
+STARTUP_ENV: dict[str, str] = {
+    "API_SECRET_KEY": "startup-benchmark",
+    "API_AUTH_SECRET_KEY": "startup-benchmark",
+}
+
+def import_times(module: str) -> dict[str, int]:
+    """Import `module` in a fresh interpreter and return cumulative import time (us) per module."""
+    env = {**os.environ, **STARTUP_ENV}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        times[name] = int(cumulative)
+    return times
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=0.0, help="Override the budget of every module")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default="")
+    args = parser.parse_args()
+
+    failures: list[str] = []
+    results = []
+    for module, (budget_ms, forbidden) in MODULES.items():
+        budget_ms = args.budget_ms or budget_ms
+        runs = [import_times(module) for _ in range(args.repeat)]
+        median_ms = statistics.median(run[module] for run in runs) / 1000
+        eager = sorted(name for name in forbidden if name in runs[0])
+
+        if median_ms > budget_ms:
+            failures.append(f"{module}: import took {median_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+        if eager:
+            failures.append(f"{module}: heavy modules imported at startup: {', '.join(eager)}")
+
+        slowest = sorted(runs[0].items(), key=lambda item: item[1], reverse=True)[1:11]
+        results.append({
+            "module": module,
+            "median_ms": round(median_ms, 1),
+            "budget_ms": budget_ms,
+            "eager_heavy_imports": eager,
+            "slowest_imports_ms": {name: round(us / 1000, 1) for name, us in slowest},
+        })
+
+    output = json.dumps({"python": sys.version.split()[0], "results": results, "failures": failures}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+
+    if failures:
+        for failure in failures:
+            print(f"Error: {failure}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from account.auth import login, logout, is_token_valid, JWT_LOCAL_STORAGE_KEY, J
 from reports.home import authenticated_home
 from reports.dashboard import dashboard
 from reports.sectors import sector
+from tools.search import company_search
+from components.live_updates import live_updates
 from streamlit_js_eval import streamlit_js_eval
 import time
 
@@ -42,17 +44,24 @@ if st.session_state.get("logged_in"):
     home_page = st.Page(authenticated_home, title="Home", icon=":material/home:")
     dashboard_page = st.Page(dashboard, title="Global", icon=":material/dashboard:")
     sectors_page = st.Page(sector, title="Sectors", icon=":material/maps_home_work:")
+    search_page = st.Page(company_search, title="Search", icon=":material/search:")
     sage_structure = {
         "GREENFLOW - SAGE": [
             home_page,
             dashboard_page,
             sectors_page,
         ],
+        "Tools": [
+            search_page,
+        ],
     }
 
     navigation_structure = {"Account": [logout_page]}
     pg = st.navigation(sage_structure | navigation_structure)
 
+    with st.sidebar:
+        live_updates()
+
     st.sidebar.subheader("Created by")
     st.sidebar.markdown(
         """
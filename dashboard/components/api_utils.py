@@ -1,29 +1,47 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 import pandas as pd
-from components.config import API_BASE_URL
+from components.config import API_BASE_URL, API_POOL_MAXSIZE, API_ACCEPT_ENCODING, DATA_CACHE_TTL, COMPANY_WINDOW_ROWS
 from pydantic import BaseModel
 from typing import Optional
 import streamlit as st
 
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Shared HTTP session so TCP/TLS connections to the API are kept alive and reused."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": API_ACCEPT_ENCODING, "Connection": "keep-alive"})
+    return session
+
 def get_headers():
     """Retrieve authorization headers if user is authenticated."""
     token = st.session_state.get("jwt_token")
     return {"Authorization": f"Bearer {token}"} if token else {}
 
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
 def fetch_sectors():
     """Fetch available sectors from API."""
-    response = requests.get(f"{API_BASE_URL}/sectors", headers=get_headers())
+    response = get_http_session().get(f"{API_BASE_URL}/sectors", headers=get_headers())
     response.raise_for_status()
     
     return response.json().get("sectors", []) if response.status_code == 200 else []
 
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
 def fetch_sector_insights():
     """Fetch available sectors from API."""
-    response = requests.get(f"{API_BASE_URL}/insights", headers=get_headers())
+    response = get_http_session().get(f"{API_BASE_URL}/insights", headers=get_headers())
     response.raise_for_status()
     
     return response.json().get("insights", []) if response.status_code == 200 else []
 
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
 def fetch_companies_by_sector(sector, page=1, page_size=10, order_by=None, order_dir=None):
     """Fetch paginated list of companies with optional sector filter."""
     params = {
@@ -34,7 +52,7 @@ def fetch_companies_by_sector(sector, page=1, page_size=10, order_by=None, order
     if order_by is not None:
         params["order_by"] = order_by
         params["order_dir"] = order_dir is not None and order_dir == "desc" and order_dir or "asc"
-    response = requests.get(f"{API_BASE_URL}/companies", params=params, headers=get_headers())
+    response = get_http_session().get(f"{API_BASE_URL}/companies", params=params, headers=get_headers())
     response.raise_for_status()
     
     if response.status_code == 200:
@@ -42,13 +60,226 @@ def fetch_companies_by_sector(sector, page=1, page_size=10, order_by=None, order
         return data.get("companies", []), data.get("total_pages", 1)
     return [], 1
 
+class CompanyWindows:
+    """
+    Process-wide cache of `/companies` windows (`window_rows` rows each) per sector and sort order.
+
+    A dashboard page is sliced from the cached window(s) holding its rows, and the previous and
+    next windows are then prefetched in a background thread. When one window holds the whole
+    sector, every sort order and page is served locally from it without calling the API.
+    """
+
+    def __init__(self, window_rows: int = COMPANY_WINDOW_ROWS, ttl: float = DATA_CACHE_TTL, max_windows: int = 64):
+        self.window_rows = window_rows
+        self.ttl = ttl
+        self.max_windows = max_windows
+        self._windows: "OrderedDict[tuple, tuple]" = OrderedDict()  # key -> (fetched_at, rows, total_count)
+        self._pending: dict[tuple, Future] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="companies-prefetch")
+
+    def clear(self) -> None:
+        """Drops every cached window (called by live updates when new data is loaded)."""
+        with self._lock:
+            self._windows.clear()
+            self._generation += 1
+
+    def _cached(self, key: tuple) -> Optional[tuple]:
+        # Caller holds the lock
+        entry = self._windows.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        self._windows.move_to_end(key)
+        return entry
+
+    def _fetch(self, key: tuple, headers: dict) -> tuple:
+        """Fetches one window from the API and caches it. Keys are (sector, order_by, order_dir, window)."""
+        sector, order_by, order_dir, window = key
+        with self._lock:
+            generation = self._generation
+        params = {
+            "sector": None if sector == "All" else sector,
+            "page": window + 1,
+            "page_size": self.window_rows,
+            "order_by": order_by,
+            "order_dir": order_dir
+        }
+        response = get_http_session().get(f"{API_BASE_URL}/companies", params=params, headers=headers)
+        if response.status_code == 404:
+            rows, total = [], 0
+        else:
+            response.raise_for_status()
+            data = response.json()
+            rows, total = data.get("companies", []), data.get("total_count", 0)
+        entry = (time.monotonic(), rows, total)
+        self._store(key, entry, generation)
+        return entry
+
+    def _store(self, key: tuple, entry: tuple, generation: int) -> None:
+        with self._lock:
+            if generation != self._generation:
+                return  # Fetched before new data was announced
+            self._windows[key] = entry
+            self._windows.move_to_end(key)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+
+    def _load(self, key: tuple, headers: dict) -> tuple:
+        """Returns a cached window, waiting for its prefetch if one is running, or fetches it."""
+        with self._lock:
+            entry = self._cached(key)
+            future = self._pending.get(key)
+        if entry is not None:
+            return entry
+        if future is not None:
+            try:
+                return future.result()
+            except requests.RequestException:
+                pass
+        return self._fetch(key, headers)
+
+    def _prefetch(self, key: tuple, headers: dict) -> None:
+        with self._lock:
+            if self._cached(key) is not None or key in self._pending:
+                return
+            self._pending[key] = self._executor.submit(self._prefetch_task, key, headers)
+
+    def _prefetch_task(self, key: tuple, headers: dict) -> tuple:
+        try:
+            return self._fetch(key, headers)
+        except requests.RequestException as e:
+            print(f"Warning: Could not prefetch companies window {key}: {e}")
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def _complete_sector(self, sector: str) -> Optional[tuple]:
+        """A cached first window holding every company of the sector (in any order), if any."""
+        with self._lock:
+            for key in list(self._windows):
+                if key[0] == sector and key[3] == 0:
+                    entry = self._cached(key)
+                    if entry is not None and entry[2] <= self.window_rows:
+                        return entry
+        return None
+
+    def _total_count(self, sector: str) -> Optional[int]:
+        with self._lock:
+            for key in list(self._windows):
+                entry = self._cached(key) if key[0] == sector else None
+                if entry is not None:
+                    return entry[2]
+        return None
+
+    def page(self, sector, page: int = 1, page_size: int = 10, order_by: str = "company", order_dir: str = "asc"):
+        """
+        Returns one page of companies, sorted like the API would (order_by, then company).
+
+        Args:
+            sector: Sector name, or "All".
+            page (int): Requested page, clamped to the last page.
+            page_size (int): Rows per page.
+            order_by (str): Sort column.
+            order_dir (str): "asc" or "desc".
+
+        Returns:
+            tuple: (companies, total_pages, page actually returned).
+        """
+        headers = get_headers()
+        order_dir = "desc" if order_dir == "desc" else "asc"
+        first_key = (sector, order_by, order_dir, 0)
+
+        total = self._total_count(sector)
+        if total is None:
+            total = self._load(first_key, headers)[2]
+        if total == 0:
+            return [], 0, 1
+        total_pages = (total + page_size - 1) // page_size
+        page = max(1, min(page, total_pages))
+        start, end = (page - 1) * page_size, min(page * page_size, total)
+
+        complete = self._complete_sector(sector) if total <= self.window_rows else None
+        if complete is not None:
+            rows = self._sorted(complete, first_key)[start:end]
+        else:
+            first_window, last_window = start // self.window_rows, (end - 1) // self.window_rows
+            rows = []
+            for window in range(first_window, last_window + 1):
+                rows.extend(self._load((sector, order_by, order_dir, window), headers)[1])
+            offset = start - first_window * self.window_rows
+            rows = rows[offset:offset + end - start]
+
+            # Warm the neighbouring windows while the user looks at this page
+            if first_window > 0:
+                self._prefetch((sector, order_by, order_dir, first_window - 1), headers)
+            if (last_window + 1) * self.window_rows < total:
+                self._prefetch((sector, order_by, order_dir, last_window + 1), headers)
+
+        return [{**row, "nr.": start + position + 1} for position, row in enumerate(rows)], total_pages, page
+
+    def _sorted(self, complete: tuple, key: tuple) -> list[dict]:
+        """Sorts a complete sector locally (cached under `key`), matching the API order and NULL placement."""
+        with self._lock:
+            entry = self._cached(key)
+            generation = self._generation
+        if entry is not None:
+            return entry[1]
+        _, order_by, order_dir, _ = key
+        ascending = order_dir == "asc"
+        df = pd.DataFrame(complete[1])
+        if not df.empty:
+            df = df.sort_values([order_by, "company"], ascending=ascending, na_position="last" if ascending else "first",
+                                kind="stable")
+        rows = df.to_dict(orient="records")
+        self._store(key, (complete[0], rows, complete[2]), generation)
+        return rows
+
+company_windows = CompanyWindows()
+
+def fetch_company_page(sector, page=1, page_size=10, order_by="company", order_dir="asc"):
+    """Fetch one page of companies from the cached windows (at most one API call)."""
+    return company_windows.page(sector, page, page_size, order_by, order_dir)
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def search_companies(query: str, sector: Optional[str] = None, limit: int = 10):
+    """Search companies by name prefix or approximate name (autocomplete)."""
+    if not query or not query.strip():
+        return []
+    params = {
+        "q": query.strip(),
+        "sector": None if sector == "All" else sector,
+        "limit": limit
+    }
+    response = get_http_session().get(f"{API_BASE_URL}/companies/search", params=params, headers=get_headers())
+    response.raise_for_status()
+
+    return response.json().get("results", []) if response.status_code == 200 else []
+
+@st.cache_data(ttl=DATA_CACHE_TTL, show_spinner=False)
+def fetch_distribution(metric: str, sector: Optional[str] = None, bins: int = 30, scale: str = "linear"):
+    """Fetch the pre-binned histogram and boxplot statistics of a metric (a few KB, whatever the data size)."""
+    params = {
+        "metric": metric,
+        "sector": None if sector == "All" else sector,
+        "bins": bins,
+        "scale": scale
+    }
+    response = get_http_session().get(f"{API_BASE_URL}/insights/distribution", params=params, headers=get_headers())
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+
+    return response.json()
+
 def fetch_sensor_data(company, sector):
     """Fetch sensor data for a selected company and sector."""
     params = {
         "sector": None if sector == "All" else sector,
         "company": None if company == "All" else company
     }
-    response = requests.get(f"{API_BASE_URL}/sensor-data", params=params, headers=get_headers())
+    response = get_http_session().get(f"{API_BASE_URL}/sensor-data", params=params, headers=get_headers())
     response.raise_for_status()
 
     print(response.json())
@@ -67,7 +298,7 @@ def register_user(username: str, password: str, confirm_password: str):
         st.stop()
 
     try:
-        response = requests.post(f"{API_BASE_URL}/register", json={"username": username, "password": password})
+        response = get_http_session().post(f"{API_BASE_URL}/register", json={"username": username, "password": password})
         response.raise_for_status()
 
         return response.status_code == 201
@@ -99,7 +330,7 @@ def authenticate_user(username: str, password: str) -> Optional[User]:
     payload = {"username": username, "password": password}
 
     try:
-        response = requests.post(API_URL, json=payload)
+        response = get_http_session().post(API_URL, json=payload)
         response.raise_for_status()
 
         data = response.json()
@@ -3,5 +3,24 @@ import os
 # API Base URL
 API_BASE_URL = os.getenv("API_BASE_URL", "http://greenflow_api:8000")
 
+# HTTP client settings (connection reuse and response compression)
+API_POOL_MAXSIZE = int(os.getenv("API_POOL_MAXSIZE", "20"))
+try:
+    import brotli  # noqa: F401 - only advertise "br" when responses can be decoded
+    _DEFAULT_ACCEPT_ENCODING = "br, gzip"
+except ImportError:
+    _DEFAULT_ACCEPT_ENCODING = "gzip"
+API_ACCEPT_ENCODING = os.getenv("API_ACCEPT_ENCODING", _DEFAULT_ACCEPT_ENCODING)
+
+# Live updates: cached API responses are invalidated by the API /events stream (Server-Sent Events),
+# so they can be kept long; without live updates they expire after DATA_CACHE_TTL seconds
+LIVE_UPDATES = os.getenv("DASHBOARD_LIVE_UPDATES", "1").lower() in ("1", "true", "yes")
+LIVE_UPDATES_CHECK_SECONDS = float(os.getenv("DASHBOARD_LIVE_UPDATES_CHECK_SECONDS", "2"))
+DATA_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "3600" if LIVE_UPDATES else "60"))
+
 # Default pagination settings
 DEFAULT_PAGE_SIZE = 10
+
+# Company tables are fetched in windows of this many rows (one /companies call, at most 1000 rows)
+# and sliced into pages locally; the neighbouring windows are prefetched in the background
+COMPANY_WINDOW_ROWS = max(1, min(int(os.getenv("DASHBOARD_COMPANY_WINDOW_ROWS", "200")), 1000))
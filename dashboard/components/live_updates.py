@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from typing import Optional
+
+import requests
+import streamlit as st
+
+from components.api_utils import (
+    fetch_sectors, fetch_sector_insights, fetch_companies_by_sector, search_companies, fetch_distribution,
+    company_windows
+)
+from components.config import API_BASE_URL, LIVE_UPDATES, LIVE_UPDATES_CHECK_SECONDS
+
+# Cached fetches to invalidate for each kind of data event
+AFFECTED_FETCHES = {
+    "sensor_data": [fetch_companies_by_sector, company_windows, search_companies, fetch_distribution],
+    "insights": [fetch_sectors, fetch_sector_insights, company_windows, fetch_distribution],
+}
+GENERATION_SESSION_KEY = "data_generation"
+
+class DataEventListener:
+    """
+    Background subscription to the API `/events` stream, shared by every session of this process.
+
+    On each new data version it clears the affected cached fetches and bumps `generation`;
+    sessions compare it with the generation they last rendered and rerun when it changed.
+    """
+
+    def __init__(self):
+        self.generation = 0
+        self.versions: dict = {}
+        self._token: Optional[str] = None
+        self._rejected_token: Optional[str] = None  # Expired token, not retried until a session has another one
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def ensure_running(self, token: Optional[str]) -> None:
+        """Starts the listener (with the token of a logged-in session) if it is not running."""
+        with self._lock:
+            if token and token != self._rejected_token:
+                self._token = token
+            if self._token and (self._thread is None or not self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name="dashboard-events", daemon=True)
+                self._thread.start()
+
+    def _handle(self, event: dict) -> None:
+        kind, version = event.get("kind"), event.get("version", 0)
+        if version <= self.versions.get(kind, 0):
+            return
+        self.versions[kind] = version
+        for fetch in AFFECTED_FETCHES.get(kind, []):
+            fetch.clear()
+        self.generation += 1
+
+    def _run(self) -> None:
+        while self._token:
+            try:
+                with requests.get(
+                    f"{API_BASE_URL}/events",
+                    headers={"Authorization": f"Bearer {self._token}", "Accept": "text/event-stream"},
+                    stream=True,
+                    timeout=(5, 60),
+                ) as response:
+                    if response.status_code == 401:
+                        # Token expired: wait for a session to provide a different one
+                        with self._lock:
+                            self._rejected_token = self._token
+                            self._token = None
+                        return
+                    response.raise_for_status()
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line and line.startswith("data:"):
+                            self._handle(json.loads(line[len("data:"):]))
+            except (requests.RequestException, ValueError) as e:
+                print(f"Live updates disconnected, reconnecting: {e}")
+            time.sleep(5)
+
+@st.cache_resource
+def get_event_listener() -> DataEventListener:
+    return DataEventListener()
+
+@st.fragment(run_every=LIVE_UPDATES_CHECK_SECONDS)
+def _watch_data_version():
+    listener = get_event_listener()
+    listener.ensure_running(st.session_state.get("jwt_token"))
+
+    seen = st.session_state.get(GENERATION_SESSION_KEY)
+    st.session_state[GENERATION_SESSION_KEY] = listener.generation
+    if seen is not None and seen != listener.generation:
+        st.toast("New data available, refreshing...", icon="🔄")
+        st.rerun(scope="app")
+
+def live_updates():
+    """Refreshes the page when the API announces new data (checks a local counter, no API polling)."""
+    if LIVE_UPDATES:
+        _watch_data_version()
@@ -10,7 +10,10 @@ def order_by_selector():
     """Dropdown for sector selection."""
     col1, col2 = st.columns([1.2, 0.7])
     with col1:
-        order_by = st.selectbox("Order by", ["nr.", "energy_kwh", "water_m3", "co2_emissions"])
+        order_by = st.selectbox(
+            "Order by",
+            ["company", "energy_kwh", "water_m3", "co2_emissions", "co2_per_kwh", "water_per_kwh", "co2_sector_percentile"]
+        )
     with col2:
         order_dir = st.selectbox("Order", ["asc", "desc"])
     return order_by, order_dir
@@ -46,3 +46,31 @@ def plot_correlation_heatmap(df):
     fig, ax = plt.subplots(figsize=(10, 5))
     sns.heatmap(df.corr(), annot=True, cmap="coolwarm", ax=ax)
     st.pyplot(fig)
+
+def plot_histogram(histogram, xlabel, title=""):
+    """Plots a histogram from server-side bins (edges and counts)."""
+    edges, counts = histogram["edges"], histogram["counts"]
+    fig, ax = plt.subplots(figsize=(10, 5))
+    widths = [right - left for left, right in zip(edges[:-1], edges[1:])]
+    ax.bar(edges[:-1], counts, width=widths, align="edge", color="steelblue", edgecolor="black")
+    if histogram.get("scale") == "log":
+        ax.set_xscale("log")
+    ax.grid(axis="y", linestyle="--", alpha=0.7)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Count")
+    if title:
+        ax.set_title(title, fontsize=14)
+    plt.tight_layout()
+    st.pyplot(fig)
+
+def plot_boxplot(boxplot, xlabel, title=""):
+    """Plots a boxplot from precomputed statistics (q1, median, q3, whislo, whishi)."""
+    fig, ax = plt.subplots(figsize=(10, 2.5))
+    stats = {key: boxplot[key] for key in ("q1", "q3", "whislo", "whishi")}
+    ax.bxp([{**stats, "med": boxplot["median"], "fliers": []}], vert=False, showfliers=False)
+    ax.set_yticks([])
+    ax.set_xlabel(xlabel)
+    if title:
+        ax.set_title(title, fontsize=14)
+    plt.tight_layout()
+    st.pyplot(fig)
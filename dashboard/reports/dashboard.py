@@ -1,8 +1,8 @@
 import os
 import streamlit as st
 import pandas as pd
-from components.api_utils import fetch_sector_insights, fetch_companies_by_sector
-from components.visualizations import plot_bar_chart, plot_correlation_heatmap
+from components.api_utils import fetch_sector_insights, fetch_companies_by_sector, fetch_distribution
+from components.visualizations import plot_bar_chart, plot_correlation_heatmap, plot_histogram, plot_boxplot
 from components.ui_components import sector_selector, order_by_selector
 
 def dashboard():
@@ -19,7 +19,7 @@ def dashboard():
 
     sector_df = pd.DataFrame(sector_data)
 
-    tab1, tab2, tab3, tab4 = st.tabs(["Energy Consumption", "Water Usage", "CO₂ Emissions", "Correlation Heatmap"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["Energy Consumption", "Water Usage", "CO₂ Emissions", "Correlation Heatmap", "Distributions"])
 
     with tab1:
         col1, col2 = st.columns(2)
@@ -49,4 +49,25 @@ def dashboard():
         # Heatmap
         st.subheader("Correlation Heatmap of Environmental Factors")
         numeric_sector_df = sector_df.select_dtypes(include=['number'])
-        plot_correlation_heatmap(numeric_sector_df)
\ No newline at end of file
+        plot_correlation_heatmap(numeric_sector_df)
+
+    with tab5:
+        st.subheader("Distribution of Environmental Metrics")
+        metrics = {"energy_kwh": "Energy (kWh)", "water_m3": "Water (m³)", "co2_emissions": "CO₂ Emissions"}
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            metric = st.selectbox("Metric", list(metrics), format_func=metrics.get)
+        with col2:
+            sector = st.selectbox("Sector", ["All"] + sorted(sector_df["sector"].unique().tolist()), key="distribution_sector")
+        with col3:
+            scale = st.radio("Bins", ["linear", "log"], horizontal=True)
+
+        distribution = fetch_distribution(metric, sector, bins=30, scale=scale)
+        if distribution is None:
+            st.info("No distribution available yet. Load data to compute it.")
+        else:
+            summary = distribution["summary"]
+            plot_histogram(distribution["histogram"], xlabel=metrics[metric])
+            plot_boxplot(summary["boxplot"], xlabel=metrics[metric])
+            quantiles = {f"p{round(float(q) * 100)}": value for q, value in summary["quantiles"].items()}
+            st.dataframe(pd.DataFrame([{"count": summary["count"], "mean": summary["mean"], **quantiles}]), hide_index=True)
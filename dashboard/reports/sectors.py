@@ -1,7 +1,7 @@
 import os
 import streamlit as st
 import pandas as pd
-from components.api_utils import fetch_companies_by_sector
+from components.api_utils import fetch_company_page
 from components.visualizations import plot_bar_chart
 from components.ui_components import sector_selector, order_by_selector
 import time
@@ -25,7 +25,10 @@ def sector():
     with col3:
         page = st.number_input("Current Page", min_value=1, value=1, step=1)
 
-    company_data, total_pages = fetch_companies_by_sector(selected_sector, page_size=page_size)
+    # One call at most: pages are sliced (and small sectors sorted) from cached, prefetched windows
+    company_data, total_pages, shown_page = fetch_company_page(
+        selected_sector, page=page, page_size=page_size, order_by=order_by, order_dir=order_dir
+    )
 
     if total_pages < 1:
         st.warning(f"No company data available for {selected_sector}.")
@@ -33,9 +36,7 @@ def sector():
 
     if page > total_pages:
         st.warning(f"Only {total_pages} pages available.")
-        page = total_pages
-
-    company_data, total_pages = fetch_companies_by_sector(selected_sector, page=page, page_size=page_size, order_by=order_by, order_dir=order_dir)
+    page = shown_page
 
     if not company_data:
         st.warning(f"No company data available for {selected_sector}.")
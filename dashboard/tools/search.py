@@ -0,0 +1,28 @@
+import streamlit as st
+import pandas as pd
+from components.api_utils import search_companies
+from components.ui_components import sector_selector
+
+def company_search():
+    """Company search with autocomplete suggestions."""
+    st.header("🔎 Company Search")
+    st.write("Find a company by the beginning of its name or an approximate spelling.")
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        # Suggestions refresh whenever the input changes (on Enter or when the field loses focus)
+        query = st.text_input("Company name", placeholder="e.g. Empresa_12", key="company_search_query")
+    with col2:
+        selected_sector = sector_selector()
+
+    if not query.strip():
+        st.info("Start typing a company name to see suggestions.")
+        return
+
+    results = search_companies(query, selected_sector, limit=20)
+    if not results:
+        st.warning(f"No companies found for \"{query}\".")
+        return
+
+    results_df = pd.DataFrame(results)
+    st.dataframe(results_df, use_container_width=True, hide_index=True)
@@ -0,0 +1,210 @@
+"""
+Optional embedded DuckDB engine for analytic reads (aggregations, top-N and distributions).
+
+`process_insights` writes a compacted Parquet snapshot of `sensor_data` (sorted by sector,
+zstd-compressed) into the data directory; DuckDB queries it in place with its vectorized,
+multi-threaded executor, so these reads never touch Postgres row storage or pandas.
+
+Enabled with ANALYTICS_ENGINE=duckdb. Each API worker process opens its own in-memory DuckDB
+database and every thread uses its own cursor. When DuckDB is not installed or no snapshot
+exists yet, callers fall back to the Postgres path.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from .load_data import DATA_DIR
+from .metrics import histogram
+
+if TYPE_CHECKING:
+    import duckdb
+    import pandas as pd
+
+# Constants
+ANALYTICS_METRICS: list[str] = ["energy_kwh", "water_m3", "co2_emissions"]
+ALL_SECTORS: str = "All"
+SNAPSHOT_ROW_GROUP_SIZE: int = 1_000_000
+QUANTILES: tuple[float, ...] = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+DUCKDB_QUERY_DURATION = histogram(
+    "greenflow_duckdb_query_duration_seconds",
+    "Time spent running analytic queries on the embedded DuckDB engine.",
+    ("query",),
+)
+
+_LOCAL = threading.local()
+_CONNECTION_LOCK = threading.Lock()
+_CONNECTION: Optional["duckdb.DuckDBPyConnection"] = None
+_CONNECTION_PID: Optional[int] = None
+
+def analytics_engine() -> str:
+    """Configured engine for analytic reads: "postgres" (default) or "duckdb"."""
+    return os.getenv("ANALYTICS_ENGINE", "postgres").lower()
+
+def snapshot_path() -> str:
+    """Path of the compacted Parquet copy of `sensor_data`."""
+    return os.getenv("ANALYTICS_SNAPSHOT_PATH", os.path.join(DATA_DIR, "analytics", "sensor_data.parquet"))
+
+@lru_cache(maxsize=1)
+def duckdb_available() -> bool:
+    try:
+        import duckdb  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def use_duckdb() -> bool:
+    """True when analytic reads should be served by DuckDB (configured, installed and a snapshot exists)."""
+    return analytics_engine() == "duckdb" and os.path.exists(snapshot_path()) and duckdb_available()
+
+def write_snapshot(df: pd.DataFrame, path: Optional[str] = None) -> Optional[str]:
+    """
+    Writes the Parquet snapshot of `sensor_data` atomically (readers see the old or the new file).
+
+    Rows are sorted by sector so row-group statistics let DuckDB skip other sectors.
+
+    Args:
+        df (pd.DataFrame): Full `sensor_data` rows.
+        path (Optional[str]): Target file; defaults to `snapshot_path()`.
+
+    Returns:
+        Optional[str]: Path written, or None if there was nothing to write.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if df is None or df.empty:
+        return None
+    path = path or snapshot_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    columns = [column for column in ["company", "sector", *ANALYTICS_METRICS] if column in df.columns]
+    table = pa.Table.from_pandas(df[columns].sort_values("sector", kind="stable"), preserve_index=False)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression="zstd", row_group_size=SNAPSHOT_ROW_GROUP_SIZE)
+    os.replace(tmp_path, path)
+    return path
+
+def _get_connection() -> "duckdb.DuckDBPyConnection":
+    """Per-process in-memory DuckDB database (recreated after a fork)."""
+    global _CONNECTION, _CONNECTION_PID
+    import duckdb
+
+    with _CONNECTION_LOCK:
+        if _CONNECTION is None or _CONNECTION_PID != os.getpid():
+            config = {"threads": int(os.getenv("DUCKDB_THREADS") or os.cpu_count() or 1)}
+            if os.getenv("DUCKDB_MEMORY_LIMIT"):
+                config["memory_limit"] = os.getenv("DUCKDB_MEMORY_LIMIT")
+            _CONNECTION = duckdb.connect(database=":memory:", config=config)
+            _CONNECTION_PID = os.getpid()
+        return _CONNECTION
+
+def get_cursor() -> "duckdb.DuckDBPyConnection":
+    """DuckDB cursor of the current thread (DuckDB connections must not be shared between threads)."""
+    connection = _get_connection()
+    if getattr(_LOCAL, "connection", None) is not connection:
+        _LOCAL.connection = connection
+        _LOCAL.cursor = connection.cursor()
+    return _LOCAL.cursor
+
+def snapshot_source() -> str:
+    # The file is re-opened by every query, so a replaced snapshot is picked up immediately
+    path = snapshot_path().replace("'", "''")
+    return f"read_parquet('{path}')"
+
+def _check_metric(metric: str) -> None:
+    if metric not in ANALYTICS_METRICS:
+        raise ValueError(f"Invalid metric: {metric}")
+
+def query_insights(sector: Optional[str] = None) -> pd.DataFrame:
+    """Sector averages (same columns as the `insights` table), optionally for a single sector."""
+    sql = (
+        "SELECT sector, avg(energy_kwh) AS avg_energy_kwh, avg(water_m3) AS avg_water_m3, "
+        f"avg(co2_emissions) AS avg_co2_emissions FROM {snapshot_source()} "
+        "WHERE ($sector IS NULL OR sector = $sector) GROUP BY sector ORDER BY sector"
+    )
+    with DUCKDB_QUERY_DURATION.time(query="insights"):
+        return get_cursor().execute(sql, {"sector": sector}).df()
+
+def query_leaderboard(metric: str, scope: str, direction: str, n: int) -> List[dict]:
+    """Top (desc) or bottom (asc) N companies by their total of a metric, overall or within a sector."""
+    _check_metric(metric)
+    order = "DESC" if direction == "desc" else "ASC"
+    sql = (
+        f"SELECT row_number() OVER (ORDER BY value {order}, company) AS rank, company, sector, value FROM ("
+        f"SELECT company, sector, sum({metric}) AS value FROM {snapshot_source()} "
+        f"WHERE company IS NOT NULL AND {metric} IS NOT NULL AND ($scope = '{ALL_SECTORS}' OR sector = $scope) "
+        f"GROUP BY company, sector) "
+        f"ORDER BY value {order}, company LIMIT $n"
+    )
+    with DUCKDB_QUERY_DURATION.time(query="leaderboard"):
+        rows = get_cursor().execute(sql, {"scope": scope, "n": n}).fetchall()
+    return [{"rank": rank, "company": company, "sector": sector, "value": value}
+            for rank, company, sector, value in rows]
+
+def query_distribution(metric: str, scope: str, bins: int = 30, scale: str = "linear") -> Optional[Dict]:
+    """
+    Exact summary and histogram of a metric, in the same shape as the quantile-sketch endpoint.
+
+    Returns:
+        Optional[Dict]: {"summary": {...}, "histogram": {"edges", "counts"}}, or None if there are no rows.
+    """
+    _check_metric(metric)
+    cursor = get_cursor()
+    where = f"{metric} IS NOT NULL AND isfinite({metric}) AND ($scope = '{ALL_SECTORS}' OR sector = $scope)"
+    quantile_list = "[" + ", ".join(str(q) for q in QUANTILES) + "]"
+
+    with DUCKDB_QUERY_DURATION.time(query="distribution"):
+        count, mean, low, high, quantiles = cursor.execute(
+            f"SELECT count(*), avg({metric}), min({metric}), max({metric}), "
+            f"quantile_cont({metric}, {quantile_list}) FROM {snapshot_source()} WHERE {where}",
+            {"scope": scope},
+        ).fetchone()
+        if not count:
+            return None
+
+        use_log = scale == "log" and low > 0
+        if high <= low:
+            edges, counts = [low, high], [count]
+        else:
+            if use_log:
+                ratio = (high / low) ** (1 / bins)
+                edges = [low * ratio ** i for i in range(bins + 1)]
+                position = f"floor(ln({metric} / $low) / ln($ratio))"
+                params = {"scope": scope, "low": low, "ratio": ratio, "bins": bins}
+            else:
+                width = (high - low) / bins
+                edges = [low + width * i for i in range(bins + 1)]
+                position = f"floor(({metric} - $low) / $width)"
+                params = {"scope": scope, "low": low, "width": width, "bins": bins}
+            edges[-1] = high
+            counts = [0] * bins
+            rows = cursor.execute(
+                f"SELECT least(greatest({position}, 0), $bins - 1)::INTEGER AS bin, count(*) "
+                f"FROM {snapshot_source()} WHERE {where} GROUP BY bin",
+                params,
+            ).fetchall()
+            for position_value, bin_count in rows:
+                counts[position_value] = bin_count
+
+    by_quantile = dict(zip(QUANTILES, quantiles))
+    q1, median, q3 = by_quantile[0.25], by_quantile[0.5], by_quantile[0.75]
+    iqr = q3 - q1
+    summary = {
+        "count": count,
+        "mean": mean,
+        "min": low,
+        "max": high,
+        "quantiles": {str(q): value for q, value in by_quantile.items()},
+        "boxplot": {
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "whislo": max(low, q1 - 1.5 * iqr),
+            "whishi": min(high, q3 + 1.5 * iqr),
+        },
+    }
+    return {"summary": summary, "histogram": {"edges": edges, "counts": counts}}
@@ -0,0 +1,232 @@
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from .load_data import COLUMN_MAPPING, DATA_DIR, TABLE_NAME, validate_sensor_data
+from .utils import load_env, get_db_engine, load_parquet_data, copy_dataframe_into_db
+from .process_insights import main as process_insights
+from .metrics import StageTimer
+from .distributions import clear_distributions, update_distributions
+from .events import notify_data_changed
+
+# Constants
+MANIFEST_FILE: str = ".ingested_manifest.json"
+DEFAULT_WORKERS: int = max(1, (os.cpu_count() or 2) - 1)
+DEFAULT_MAX_CONNECTIONS: int = 4
+
+def resolve_shards(pattern: str, data_dir: str = DATA_DIR) -> List[str]:
+    """
+    Resolves a directory or glob pattern (relative to `data_dir`) to a sorted list of Parquet files.
+
+    Args:
+        pattern (str): Directory name or glob, e.g. "2025-02-14/" or "shards/*.parquet".
+        data_dir (str): Base data directory; resolved files must stay inside it.
+
+    Returns:
+        List[str]: Paths of the matching Parquet files.
+    """
+    base = os.path.realpath(data_dir)
+    target = os.path.join(base, pattern)
+    if os.path.isdir(target):
+        target = os.path.join(target, "**", "*.parquet")
+
+    files = sorted(
+        path for path in glob.glob(target, recursive=True)
+        if path.endswith(".parquet") and os.path.isfile(path)
+    )
+
+    outside = [path for path in files if not os.path.realpath(path).startswith(base + os.sep)]
+    if outside:
+        raise ValueError(f"Pattern resolves outside of {data_dir}: {pattern}")
+    return files
+
+def _file_signature(path: str) -> Dict[str, float]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+class IngestionManifest:
+    """Processed-files manifest (JSON in the data directory) making batch ingestion resumable."""
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.path = os.path.join(data_dir, MANIFEST_FILE)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, dict] = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.entries = json.load(f)
+
+    def _key(self, path: str) -> str:
+        return os.path.relpath(os.path.realpath(path), os.path.dirname(os.path.realpath(self.path)))
+
+    def is_processed(self, path: str) -> bool:
+        """True if the file was already ingested and has not changed since."""
+        entry = self.entries.get(self._key(path))
+        return entry is not None and all(entry.get(k) == v for k, v in _file_signature(path).items())
+
+    def mark_processed(self, path: str, rows: int) -> None:
+        """Records a file as ingested and persists the manifest atomically."""
+        with self._lock:
+            self.entries[self._key(path)] = {**_file_signature(path), "rows": rows, "loaded_at": int(time.time())}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def reset(self) -> None:
+        """Forgets every processed file."""
+        with self._lock:
+            self.entries = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+def prepare_shard(path: str):
+    """
+    Reads, maps and validates one shard (runs in a worker process).
+
+    Returns:
+        pd.DataFrame: Shard rows with the `sensor_data` columns, in table order.
+    """
+    df = load_parquet_data(path, COLUMN_MAPPING)
+    validate_sensor_data(df)
+    return df[list(COLUMN_MAPPING.values())]
+
+def batch_load(
+    pattern: str,
+    workers: int = DEFAULT_WORKERS,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    replace: bool = False,
+    delete_processed: bool = False,
+    data_dir: str = DATA_DIR,
+) -> dict:
+    """
+    Ingests every Parquet shard matching `pattern` into `sensor_data`, then recomputes insights once.
+
+    Shards are read, mapped and validated in parallel in a process pool, and bulk-loaded with COPY over
+    at most `max_connections` database connections. Shards already listed in the manifest (and unchanged)
+    are skipped, so an interrupted run can simply be restarted.
+
+    Args:
+        pattern (str): Directory or glob, relative to `data_dir`.
+        workers (int): Worker processes reading and validating shards.
+        max_connections (int): Maximum concurrent database connections used for loading.
+        replace (bool): Empty `sensor_data` (and the manifest) before loading instead of appending.
+        delete_processed (bool): Delete each shard once it has been loaded.
+        data_dir (str): Base data directory.
+
+    Returns:
+        dict: Per-file report with "loaded", "skipped" and "failed" entries, total rows and insights status.
+    """
+    from sqlalchemy import text
+
+    load_env()
+    engine = get_db_engine()
+    files = resolve_shards(pattern, data_dir)
+    if not files:
+        raise FileNotFoundError(f"Error: No Parquet files match {pattern} in {data_dir}")
+
+    manifest = IngestionManifest(data_dir)
+    if replace:
+        manifest.reset()
+        with engine.begin() as conn:
+            conn.execute(text(f"TRUNCATE TABLE {TABLE_NAME}"))
+        clear_distributions(engine)
+
+    report: dict = {"loaded": [], "skipped": [], "failed": [], "rows": 0, "insights_updated": False}
+    pending = []
+    for path in files:
+        if manifest.is_processed(path):
+            report["skipped"].append({"file": os.path.relpath(path, data_dir)})
+        else:
+            pending.append(path)
+
+    print(f"Batch ingestion: {len(pending)} shard(s) to load, {len(report['skipped'])} already processed.")
+
+    def load_shard(path: str, df) -> Tuple[str, int]:
+        with StageTimer("batch_load", "insert", rows=len(df)):
+            rows = copy_dataframe_into_db(engine, df, TABLE_NAME)
+        try:
+            with StageTimer("batch_load", "distributions", rows=rows):
+                update_distributions(engine, df)
+        except Exception as e:
+            # The rows are committed: record the shard anyway, `python -m db.distributions` rebuilds
+            print(f"Error: Failed to update distributions for {path}: {e}")
+        manifest.mark_processed(path, rows)
+        if delete_processed:
+            os.remove(path)
+        return path, rows
+
+    # Spawned (not forked) workers: safe to start from a multi-threaded API process
+    context = multiprocessing.get_context("spawn")
+    with StageTimer("batch_load", "total") as total_stage, \
+            ProcessPoolExecutor(max_workers=max(1, workers), mp_context=context) as process_pool, \
+            ThreadPoolExecutor(max_workers=max(1, max_connections)) as insert_pool:
+        read_futures: Dict[Future, str] = {}
+        insert_futures: Dict[Future, str] = {}
+        queued = iter(pending)
+        # Bound the shards held in memory: reading ahead at most one shard per worker/connection
+        max_in_flight = max(1, workers) + max(1, max_connections)
+
+        while True:
+            while len(read_futures) + len(insert_futures) < max_in_flight:
+                path = next(queued, None)
+                if path is None:
+                    break
+                read_futures[process_pool.submit(prepare_shard, path)] = path
+            if not read_futures and not insert_futures:
+                break
+
+            done, _ = wait(list(read_futures) + list(insert_futures), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in read_futures:
+                    path = read_futures.pop(future)
+                    try:
+                        df = future.result()
+                    except Exception as e:
+                        print(f"Error: Failed to read {path}: {e}")
+                        report["failed"].append({"file": os.path.relpath(path, data_dir), "stage": "read", "error": str(e)})
+                        continue
+                    insert_futures[insert_pool.submit(load_shard, path, df)] = path
+                else:
+                    path = insert_futures.pop(future)
+                    try:
+                        _, rows = future.result()
+                    except Exception as e:
+                        print(f"Error: Failed to load {path}: {e}")
+                        report["failed"].append({"file": os.path.relpath(path, data_dir), "stage": "insert", "error": str(e)})
+                        continue
+                    report["loaded"].append({"file": os.path.relpath(path, data_dir), "rows": rows})
+                    report["rows"] += rows
+        total_stage.rows = report["rows"]
+
+    if report["loaded"] or replace:
+        notify_data_changed(engine, "sensor_data", rows=report["rows"])
+        report["insights_updated"] = bool(process_insights())
+
+    print(
+        f"Batch ingestion finished: {len(report['loaded'])} loaded, {len(report['skipped'])} skipped, "
+        f"{len(report['failed'])} failed, {report['rows']} rows."
+    )
+    return report
+
+def main(argv: Optional[List[str]] = None) -> dict:
+    """CLI entry point: python -m db.batch_load <pattern> [--workers N] [--connections N] [--replace]."""
+    parser = argparse.ArgumentParser(description="Parallel ingestion of a directory or glob of Parquet shards.")
+    parser.add_argument("pattern", help=f"Directory or glob relative to {DATA_DIR}/")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--connections", type=int, default=DEFAULT_MAX_CONNECTIONS)
+    parser.add_argument("--replace", action="store_true", help="Empty sensor_data before loading")
+    parser.add_argument("--delete-processed", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = batch_load(args.pattern, args.workers, args.connections, args.replace, args.delete_processed)
+    print(json.dumps(report, indent=2))
+    return report
+
+if __name__ == "__main__":
+    main()
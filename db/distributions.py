@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import sys
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from .utils import load_env, get_db_engine, fetch_table_data
+from .sketches import QuantileSketch
+from .metrics import StageTimer
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from sqlalchemy.engine.base import Engine
+
+# Constants
+TABLE_SENSOR_DATA: str = "sensor_data"
+TABLE_DISTRIBUTIONS: str = "distributions"
+DISTRIBUTION_METRICS: list[str] = ["energy_kwh", "water_m3", "co2_emissions"]
+ALL_SECTORS: str = "All"
+
+CREATE_DISTRIBUTIONS_SQL: str = f"""
+    CREATE TABLE IF NOT EXISTS {TABLE_DISTRIBUTIONS} (
+        scope VARCHAR(100) NOT NULL,
+        metric VARCHAR(50) NOT NULL,
+        sketch TEXT NOT NULL,
+        updated_at BIGINT NOT NULL DEFAULT EXTRACT(EPOCH FROM NOW()),
+        PRIMARY KEY (scope, metric)
+    )
+"""
+
+def compute_sketches(df: pd.DataFrame) -> Dict[Tuple[str, str], QuantileSketch]:
+    """
+    Builds one quantile sketch per (scope, metric), where scope is each sector and "All".
+
+    Args:
+        df (pd.DataFrame): Sensor data rows (sensor_data column names).
+
+    Returns:
+        Dict[Tuple[str, str], QuantileSketch]: Sketches keyed by (scope, metric).
+    """
+    sketches: Dict[Tuple[str, str], QuantileSketch] = {}
+    if df is None or df.empty:
+        return sketches
+
+    for metric in DISTRIBUTION_METRICS:
+        sketches[(ALL_SECTORS, metric)] = QuantileSketch().add_many(df[metric].to_numpy())
+        for sector, values in df.groupby("sector", sort=False, observed=True)[metric]:
+            sketches[(str(sector), metric)] = QuantileSketch().add_many(values.to_numpy())
+    return sketches
+
+def update_distributions(engine: Engine, df: pd.DataFrame, replace: bool = False) -> int:
+    """
+    Merges the sketches of newly loaded rows into the stored distributions.
+
+    Args:
+        engine (Engine): Database engine connection.
+        df (pd.DataFrame): Newly loaded rows.
+        replace (bool): Discard the stored distributions first (the rows replace the whole dataset).
+
+    Returns:
+        int: Number of (scope, metric) distributions written.
+    """
+    from sqlalchemy import text
+
+    sketches = compute_sketches(df)
+    with engine.begin() as conn:
+        conn.execute(text(CREATE_DISTRIBUTIONS_SQL))
+        # Serialize concurrent writers (batch shards, ingest flushes) so they merge instead of overwriting
+        conn.execute(text(f"LOCK TABLE {TABLE_DISTRIBUTIONS} IN SHARE ROW EXCLUSIVE MODE"))
+        if replace:
+            conn.execute(text(f"DELETE FROM {TABLE_DISTRIBUTIONS}"))
+        for (scope, metric), sketch in sketches.items():
+            stored = conn.execute(
+                text(f"SELECT sketch FROM {TABLE_DISTRIBUTIONS} WHERE scope = :scope AND metric = :metric"),
+                {"scope": scope, "metric": metric},
+            ).scalar()
+            if stored is not None:
+                sketch = QuantileSketch.from_dict(json.loads(stored)).merge(sketch)
+            conn.execute(
+                text(
+                    f"INSERT INTO {TABLE_DISTRIBUTIONS} (scope, metric, sketch, updated_at) "
+                    "VALUES (:scope, :metric, :sketch, EXTRACT(EPOCH FROM NOW())) "
+                    "ON CONFLICT (scope, metric) DO UPDATE SET sketch = EXCLUDED.sketch, updated_at = EXCLUDED.updated_at"
+                ),
+                {"scope": scope, "metric": metric, "sketch": json.dumps(sketch.to_dict())},
+            )
+    return len(sketches)
+
+def clear_distributions(engine: Engine) -> None:
+    """Deletes every stored distribution (before a full reload)."""
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        conn.execute(text(CREATE_DISTRIBUTIONS_SQL))
+        conn.execute(text(f"DELETE FROM {TABLE_DISTRIBUTIONS}"))
+
+def fetch_distribution(engine: Engine, metric: str, scope: str = ALL_SECTORS) -> Optional[QuantileSketch]:
+    """Returns the stored sketch of a metric for a sector (or "All"), or None."""
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        stored = conn.execute(
+            text(f"SELECT sketch FROM {TABLE_DISTRIBUTIONS} WHERE scope = :scope AND metric = :metric"),
+            {"scope": scope, "metric": metric},
+        ).scalar()
+    return None if stored is None else QuantileSketch.from_dict(json.loads(stored))
+
+def main() -> bool:
+    """Rebuilds every distribution from the full sensor_data table."""
+    try:
+        print("Starting distributions rebuild...")
+        load_env()
+        engine = get_db_engine()
+        df = fetch_table_data(engine, TABLE_SENSOR_DATA)
+        with StageTimer("distributions", "rebuild", rows=0 if df is None else len(df)):
+            update_distributions(engine, df, replace=True)
+        return True
+    except Exception as e:
+        print(f"Error occurred: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
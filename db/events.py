@@ -0,0 +1,157 @@
+"""
+Data-change events over PostgreSQL LISTEN/NOTIFY.
+
+Writers (`load_data`, `batch_load`, ingestion and `process_insights`) call `notify_data_changed`
+once their data is committed. Every API worker runs a `DataEventBroker`, whose listener thread
+holds one LISTEN connection to the primary and fans each event out to the worker's subscribers
+(the `/events` Server-Sent Events streams).
+"""
+from __future__ import annotations
+
+import json
+import os
+import select
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .metrics import counter, gauge
+
+if TYPE_CHECKING:
+    import asyncio
+    from sqlalchemy.engine.base import Engine
+
+# Constants
+EVENTS_CHANNEL: str = "greenflow_data_events"
+EVENT_KINDS: tuple[str, ...] = ("sensor_data", "insights")
+
+DATA_EVENTS = counter("greenflow_data_events_total", "Data-change events by kind and direction.", ("kind", "direction"))
+EVENT_SUBSCRIBERS = gauge("greenflow_event_subscribers", "Open /events streams in this API worker.")
+
+def notify_data_changed(engine: Engine, kind: str, **details: Any) -> Optional[dict]:
+    """
+    Publishes a data-version event (NOTIFY) after a commit. Failures are logged, never raised.
+
+    Args:
+        engine (Engine): Database engine connection (primary).
+        kind (str): What changed: "sensor_data" (raw rows) or "insights" (derived tables).
+        **details: Extra JSON fields, e.g. rows=1000.
+
+    Returns:
+        Optional[dict]: The published event, or None if it could not be sent.
+    """
+    from sqlalchemy import text
+
+    event = {"kind": kind, "version": int(time.time() * 1000), **details}
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                         {"channel": EVENTS_CHANNEL, "payload": json.dumps(event)})
+    except Exception as e:
+        print(f"Warning: Could not publish the {kind} data event: {e}")
+        return None
+    DATA_EVENTS.inc(kind=kind, direction="sent")
+    return event
+
+class DataEventBroker:
+    """
+    Per-process LISTEN thread fanning data events out to asyncio subscribers.
+
+    Each subscriber gets its own queue; the latest event of every kind is kept so that new
+    subscribers start from the current data versions.
+    """
+
+    def __init__(self, channel: str = EVENTS_CHANNEL, reconnect_delay: float = 5.0, queue_size: int = 100):
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self.queue_size = queue_size
+        self.latest: Dict[str, dict] = {}
+        self._subscribers: List[Tuple["asyncio.AbstractEventLoop", "asyncio.Queue"]] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._stopping = threading.Event()
+
+    def _ensure_started(self) -> None:
+        # Started lazily (and again after a fork) so every API worker listens on its own connection
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="data-events-listener", daemon=True)
+        self._thread.start()
+
+    def subscribe(self, loop: "asyncio.AbstractEventLoop") -> "asyncio.Queue":
+        """Registers a subscriber running on `loop` and returns the queue its events are put on."""
+        import asyncio
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._ensure_started()
+            self._subscribers.append((loop, queue))
+            EVENT_SUBSCRIBERS.set(len(self._subscribers))
+        return queue
+
+    def unsubscribe(self, queue: "asyncio.Queue") -> None:
+        with self._lock:
+            self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+            EVENT_SUBSCRIBERS.set(len(self._subscribers))
+
+    def _dispatch(self, event: dict) -> None:
+        DATA_EVENTS.inc(kind=event.get("kind", ""), direction="received")
+        with self._lock:
+            self.latest[event.get("kind", "")] = event
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:  # Loop already closed
+                self.unsubscribe(queue)
+
+    def _run(self) -> None:
+        import psycopg2
+        import psycopg2.extensions
+        from .config import get_settings
+
+        settings = get_settings()
+        while not self._stopping.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(settings.database_url, connect_timeout=settings.connect_timeout)
+                connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                while not self._stopping.is_set():
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        try:
+                            self._dispatch(json.loads(notification.payload))
+                        except ValueError:
+                            print(f"Warning: Ignoring malformed data event: {notification.payload}")
+            except Exception as e:
+                print(f"Warning: Data events listener disconnected, reconnecting in {self.reconnect_delay}s: {e}")
+                self._stopping.wait(self.reconnect_delay)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stops the listener thread (called on API shutdown)."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stopping.set()
+        self._thread.join(timeout=timeout)
+
+def _offer(queue: "asyncio.Queue", event: dict) -> None:
+    # A slow subscriber only needs the newest versions: drop its oldest pending event
+    import asyncio
+
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(event)
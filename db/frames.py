@@ -0,0 +1,134 @@
+"""
+Compact, typed DataFrames for the load and API paths.
+
+Repeated labels (company, sector...) are stored as categoricals (dictionary-encoded) unless
+they are mostly unique, other strings as Arrow-backed strings instead of Python objects, and metrics optionally as float32
+(FRAME_FLOAT32=1). Tables are read in chunks so that no intermediate object-dtype frame of the
+whole table is ever built. `memory_report` logs and exports the footprint of a frame per stage.
+"""
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+from .metrics import gauge
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from sqlalchemy.engine.base import Engine
+
+# Constants
+CATEGORICAL_COLUMNS: tuple[str, ...] = ("company", "sector", "scope", "metric", "direction")
+STRING_DTYPE: str = "string[pyarrow]"
+CATEGORY_MAX_UNIQUE_RATIO: float = 0.5  # Above this, a categorical is larger than plain Arrow strings
+DEFAULT_CHUNK_ROWS: int = 100_000
+
+# Column dtypes of the tables read by the API and the insights pipeline (strings are
+# categorized once the chunks are concatenated)
+TABLE_COLUMNS: Dict[str, Dict[str, str]] = {
+    "sensor_data": {"company": "string", "sector": "string", "energy_kwh": "float", "water_m3": "float", "co2_emissions": "float"},
+    "insights": {"sector": "string", "avg_energy_kwh": "float", "avg_water_m3": "float", "avg_co2_emissions": "float"},
+}
+
+FRAME_MEMORY_BYTES = gauge(
+    "greenflow_dataframe_memory_bytes",
+    "Memory used by the DataFrame of a pipeline stage (deep, last run).",
+    ("pipeline", "stage"),
+)
+
+def use_float32() -> bool:
+    """True when metrics are kept as float32 (FRAME_FLOAT32=1) to halve their memory."""
+    return os.getenv("FRAME_FLOAT32", "0").lower() in ("1", "true", "yes")
+
+def table_dtypes(table_name: str) -> Optional[Dict[str, str]]:
+    """Explicit read dtypes of a known table, or None to let pandas infer them."""
+    columns = TABLE_COLUMNS.get(table_name)
+    if columns is None:
+        return None
+    float_dtype = "float32" if use_float32() else "float64"
+    return {name: STRING_DTYPE if kind == "string" else float_dtype for name, kind in columns.items()}
+
+def compact_frame(df: pd.DataFrame, categorical: Iterable[str] = CATEGORICAL_COLUMNS,
+                  float32: Optional[bool] = None) -> pd.DataFrame:
+    """
+    Converts a DataFrame to compact dtypes, in place.
+
+    Args:
+        df (pd.DataFrame): Frame to convert.
+        categorical (Iterable[str]): Columns stored as categoricals when present.
+        float32 (Optional[bool]): Downcast float64 columns; defaults to FRAME_FLOAT32.
+
+    Returns:
+        pd.DataFrame: The converted frame.
+    """
+    import pandas as pd
+
+    categorical = set(categorical)
+    float32 = use_float32() if float32 is None else float32
+    for name in df.columns:
+        dtype = df[name].dtype
+        if name in categorical:
+            is_category = isinstance(dtype, pd.CategoricalDtype)
+            unique = len(dtype.categories) if is_category else df[name].nunique()
+            if unique > CATEGORY_MAX_UNIQUE_RATIO * max(len(df), 1):
+                df[name] = df[name].astype(STRING_DTYPE)
+            elif not is_category:
+                df[name] = df[name].astype("category")
+        elif dtype == object and pd.api.types.infer_dtype(df[name], skipna=True) == "string":
+            df[name] = df[name].astype(STRING_DTYPE)
+        elif float32 and dtype == "float64":
+            df[name] = df[name].astype("float32")
+    return df
+
+def read_sql_chunks(engine: Engine, query: str, dtypes: Optional[Dict[str, str]] = None,
+                    chunksize: int = DEFAULT_CHUNK_ROWS) -> List[pd.DataFrame]:
+    """
+    Reads a query in chunks through a server-side cursor, applying explicit dtypes to every chunk.
+
+    Args:
+        engine (Engine): Database engine connection.
+        query (str): SQL query.
+        dtypes (Optional[Dict[str, str]]): Column dtypes (see `table_dtypes`).
+        chunksize (int): Rows per chunk.
+
+    Returns:
+        List[pd.DataFrame]: The chunks, to be combined with `combine_chunks`.
+    """
+    import pandas as pd
+    from sqlalchemy import text
+
+    chunks: List[pd.DataFrame] = []
+    with engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True)
+        for chunk in pd.read_sql(text(query), conn, chunksize=chunksize, coerce_float=True):
+            if dtypes:
+                chunk = chunk.astype({name: dtype for name, dtype in dtypes.items() if name in chunk.columns})
+            chunks.append(chunk)
+    return chunks
+
+def combine_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenates chunks read by `read_sql_chunks` into one compact frame."""
+    import pandas as pd
+
+    if not chunks:
+        return pd.DataFrame()
+    # Strings stay Arrow-backed while concatenating and are only categorized once
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+    return compact_frame(df)
+
+def memory_report(df: Optional[pd.DataFrame], pipeline: str, stage: str, log: bool = True) -> int:
+    """
+    Exports (and logs, unless `log` is False) the deep memory usage of a frame for a pipeline stage.
+
+    Returns:
+        int: Memory used, in bytes.
+    """
+    if df is None:
+        return 0
+    memory = int(df.memory_usage(deep=True).sum())
+    FRAME_MEMORY_BYTES.set(memory, pipeline=pipeline, stage=stage)
+    if not log:
+        return memory
+    per_row = memory / len(df) if len(df) else 0
+    print(f"[{pipeline}] {stage}: {memory / 1_048_576:.1f} MB in memory ({per_row:.0f} bytes/row)")
+    return memory
@@ -1,6 +1,10 @@
 import os
 import sys
 from .utils import load_env, get_db_engine, load_parquet_data, insert_data_into_db
+from .metrics import StageTimer
+from .distributions import update_distributions
+from .frames import memory_report
+from .events import notify_data_changed
 
 # Constants
 PARQUET_FILE_PATH: str = "data/dados_sensores_5000.parquet"
@@ -14,6 +18,21 @@ COLUMN_MAPPING: dict[str, str] = {
     "setor": "sector"
 }
 
+def validate_sensor_data(df) -> None:
+    """
+    Checks that a loaded (renamed) DataFrame has the columns and types expected by `sensor_data`.
+
+    Raises:
+        ValueError: If required columns are missing or metrics are not numeric.
+    """
+    missing_columns = set(COLUMN_MAPPING.values()) - set(df.columns)
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {missing_columns}")
+
+    for column in ("energy_kwh", "water_m3", "co2_emissions"):
+        if df[column].dtype.kind not in "iuf":
+            raise ValueError(f"Column {column} must be numeric, got {df[column].dtype}")
+
 def main(path_to_file: str = "") -> bool:
     """Main function to orchestrate data loading."""
     try:
@@ -33,8 +52,22 @@ def main(path_to_file: str = "") -> bool:
         else:
             final_path_to_file = PARQUET_FILE_PATH
 
-        df = load_parquet_data(final_path_to_file, COLUMN_MAPPING)  # Load Parquet data
-        return insert_data_into_db(engine, df, TABLE_NAME)  # Insert into DB
+        with StageTimer("load_data", "read_parquet") as stage:
+            df = load_parquet_data(final_path_to_file, COLUMN_MAPPING)  # Load Parquet data
+            stage.rows = len(df)
+        memory_report(df, "load_data", "read_parquet")
+
+        with StageTimer("load_data", "validate", rows=len(df)):
+            validate_sensor_data(df)
+
+        with StageTimer("load_data", "insert", rows=len(df)):
+            inserted = insert_data_into_db(engine, df, TABLE_NAME)  # Insert into DB
+
+        with StageTimer("load_data", "distributions", rows=len(df)):
+            update_distributions(engine, df, replace=True)  # The file replaces the whole dataset
+
+        notify_data_changed(engine, "sensor_data", rows=len(df))
+        return inserted
     except Exception as e:
         print(f"Error occurred: {e}")
         raise e
@@ -0,0 +1,214 @@
+"""
+Lightweight, dependency-free Prometheus-style metrics (counters, gauges and histograms).
+
+Metrics are kept in-process (one set per API worker) and rendered in the Prometheus text
+exposition format by `render_metrics()`, which backs the API `/metrics` endpoint.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+# Latency buckets in seconds, from 1 ms to 60 s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_REGISTRY: Dict[str, "_Metric"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    """Base class: a named metric with a fixed set of label names."""
+    kind: str = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self) -> list:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    """Distribution of observed values over cumulative buckets."""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts: Dict[Tuple[str, ...], list] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the duration (in seconds) of the wrapped block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+def _register(metric: _Metric) -> _Metric:
+    with _REGISTRY_LOCK:
+        existing = _REGISTRY.get(metric.name)
+        if existing is not None:
+            return existing
+        _REGISTRY[metric.name] = metric
+        return metric
+
+def counter(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    """Returns the counter registered under `name`, creating it if needed."""
+    return _register(Counter(name, documentation, labelnames))
+
+def gauge(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+    """Returns the gauge registered under `name`, creating it if needed."""
+    return _register(Gauge(name, documentation, labelnames))
+
+def histogram(name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    """Returns the histogram registered under `name`, creating it if needed."""
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+def render_metrics() -> str:
+    """Renders every registered metric in the Prometheus text exposition format."""
+    with _REGISTRY_LOCK:
+        metrics = list(_REGISTRY.values())
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+# Shared metrics used across the API and the ingestion pipeline
+HTTP_REQUEST_DURATION = histogram(
+    "greenflow_http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status"))
+DB_QUERY_DURATION = histogram(
+    "greenflow_db_query_duration_seconds", "Time spent executing database queries.", ("table",))
+DB_ROWS_RETURNED = counter(
+    "greenflow_db_rows_returned_total", "Rows returned by database queries.", ("table",))
+DATAFRAME_CONVERSION_DURATION = histogram(
+    "greenflow_dataframe_conversion_duration_seconds", "Time spent building pandas DataFrames from query rows.",
+    ("table",))
+SERIALIZATION_DURATION = histogram(
+    "greenflow_serialization_duration_seconds", "Time spent converting results to JSON-ready records.",
+    ("endpoint",))
+CACHE_REQUESTS = counter(
+    "greenflow_cache_requests_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result"))
+PIPELINE_STAGE_DURATION = histogram(
+    "greenflow_pipeline_stage_duration_seconds", "Duration of ingestion/insights pipeline stages.",
+    ("pipeline", "stage"))
+PIPELINE_STAGE_ROWS = counter(
+    "greenflow_pipeline_stage_rows_total", "Rows processed by ingestion/insights pipeline stages.",
+    ("pipeline", "stage"))
+PIPELINE_STAGE_ROWS_PER_SECOND = gauge(
+    "greenflow_pipeline_stage_rows_per_second", "Throughput of the last run of each pipeline stage.",
+    ("pipeline", "stage"))
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Counts a cache lookup as a hit or a miss."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+class StageTimer:
+    """
+    Times a pipeline stage and records its duration, row count and throughput.
+
+    Usage:
+        with StageTimer("load_data", "read_parquet") as stage:
+            df = ...
+            stage.rows = len(df)
+    """
+
+    def __init__(self, pipeline: str, stage: str, rows: Optional[int] = None):
+        self.pipeline = pipeline
+        self.stage = stage
+        self.rows = rows
+        self.elapsed: float = 0.0
+
+    def __enter__(self) -> "StageTimer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.elapsed = time.perf_counter() - self._start
+        labels = {"pipeline": self.pipeline, "stage": self.stage}
+        PIPELINE_STAGE_DURATION.observe(self.elapsed, **labels)
+        message = f"[{self.pipeline}] {self.stage}: {self.elapsed * 1000:.1f} ms"
+        if self.rows is not None and exc_type is None:
+            PIPELINE_STAGE_ROWS.inc(self.rows, **labels)
+            rows_per_second = self.rows / self.elapsed if self.elapsed > 0 else 0.0
+            PIPELINE_STAGE_ROWS_PER_SECOND.set(rows_per_second, **labels)
+            message += f", {self.rows} rows ({rows_per_second:,.0f} rows/s)"
+        print(message)
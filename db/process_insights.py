@@ -1,22 +1,75 @@
+from __future__ import annotations
+
 import sys
-from .utils import load_env, get_db_engine, fetch_table_data, insert_data_into_db
-import pandas as pd
+from typing import TYPE_CHECKING
+from .utils import load_env, get_db_engine, fetch_table_data, insert_data_into_db, swap_in_table
+from .metrics import StageTimer
+from .search import build_company_search_index
+from .analytics import analytics_engine, write_snapshot
+from .frames import memory_report
+from .events import notify_data_changed
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Constants
 TABLE_SENSOR_DATA: str = "sensor_data"
 TABLE_INSIGHTS: str = "insights"
+TABLE_LEADERBOARDS: str = "leaderboards"
+LEADERBOARD_METRICS: list[str] = ["energy_kwh", "water_m3", "co2_emissions"]
+LEADERBOARD_MAX_N: int = 100
+LEADERBOARD_ALL_SECTORS: str = "All"
+TABLE_COMPANY_INSIGHTS: str = "company_insights"
+COMPANY_SORT_KEYS: list[str] = [
+    "company", "energy_kwh", "water_m3", "co2_emissions", "readings",
+    "co2_per_kwh", "water_per_kwh", "co2_sector_percentile",
+]
+
+# Per-company totals, means, intensity ratios and sector percentile ranks, built in a staging table
+# that is swapped in once indexed (readers keep the previous version until then)
+BUILD_COMPANY_INSIGHTS_SQL: list[str] = [
+    f"DROP TABLE IF EXISTS {TABLE_COMPANY_INSIGHTS}_staging",
+    f"""CREATE TABLE {TABLE_COMPANY_INSIGHTS}_staging AS
+        WITH totals AS (
+            SELECT company, sector, count(*) AS readings,
+                   sum(energy_kwh) AS energy_kwh, sum(water_m3) AS water_m3, sum(co2_emissions) AS co2_emissions,
+                   avg(energy_kwh) AS avg_energy_kwh, avg(water_m3) AS avg_water_m3, avg(co2_emissions) AS avg_co2_emissions
+            FROM {TABLE_SENSOR_DATA}
+            WHERE company IS NOT NULL
+            GROUP BY company, sector
+        ), ratios AS (
+            SELECT *, co2_emissions / NULLIF(energy_kwh, 0) AS co2_per_kwh,
+                   water_m3 / NULLIF(energy_kwh, 0) AS water_per_kwh
+            FROM totals
+        )
+        SELECT *,
+               percent_rank() OVER (PARTITION BY sector ORDER BY energy_kwh) AS energy_sector_percentile,
+               percent_rank() OVER (PARTITION BY sector ORDER BY co2_emissions) AS co2_sector_percentile,
+               percent_rank() OVER (PARTITION BY sector ORDER BY co2_per_kwh) AS co2_intensity_sector_percentile
+        FROM ratios""",
+    # Sort key (plus company, the pagination tie-breaker), overall and within a sector
+    *[
+        f"CREATE INDEX {TABLE_COMPANY_INSIGHTS}_staging_{prefix}{key}_idx ON {TABLE_COMPANY_INSIGHTS}_staging "
+        f"({leading}{key}{'' if key == 'company' else ', company'})"
+        for key in COMPANY_SORT_KEYS
+        for prefix, leading in (("", ""), ("sector_", "sector, "))
+    ],
+    f"ANALYZE {TABLE_COMPANY_INSIGHTS}_staging",
+]
 
 def compute_insights(df: pd.DataFrame) -> pd.DataFrame:
     """Computes sector-wise sustainability insights."""
+    import pandas as pd
+
     if df.empty:
         print("Warning: No data found in sensor_data table. Insights table will not be updated.")
         return pd.DataFrame()
 
-    insights_df: pd.DataFrame = df.groupby("sector").agg({
+    insights_df: pd.DataFrame = df.groupby("sector", observed=True).agg({
         "energy_kwh": "mean",
         "water_m3": "mean",
         "co2_emissions": "mean"
-    }).reset_index()
+    }).astype("float64").reset_index()  # Stored as FLOAT even when metrics are read as float32
 
     # Rename columns to match PostgreSQL schema
     insights_df.rename(columns={
@@ -27,18 +80,116 @@ def compute_insights(df: pd.DataFrame) -> pd.DataFrame:
 
     return insights_df
 
+def compute_leaderboards(df: pd.DataFrame, n: int = LEADERBOARD_MAX_N) -> pd.DataFrame:
+    """
+    Computes the top-N and bottom-N companies per metric, overall and per sector.
+
+    Companies are ranked by their total over all their readings (the `company_insights` totals),
+    so each company takes a single rank.
+
+    Args:
+        df (pd.DataFrame): Sensor data.
+        n (int): Number of entries kept per leaderboard.
+
+    Returns:
+        pd.DataFrame: Rows (scope, metric, direction, rank, company, sector, value), where scope is
+        a sector name or "All".
+    """
+    import pandas as pd
+
+    # One row per company: sum(min_count=1) keeps a company without any value of a metric out of its boards
+    totals = (
+        df.dropna(subset=["company"])
+        .groupby(["company", "sector"], observed=True)[LEADERBOARD_METRICS]
+        .sum(min_count=1)
+        .reset_index()
+    )
+
+    boards = []
+    for metric in LEADERBOARD_METRICS:
+        for direction, ascending in (("desc", False), ("asc", True)):
+            ordered = totals[["company", "sector", metric]].dropna(subset=[metric]).sort_values(
+                [metric, "company"], ascending=[ascending, True], kind="stable"
+            )
+
+            overall = ordered.head(n).assign(scope=LEADERBOARD_ALL_SECTORS)
+            overall["rank"] = range(1, len(overall) + 1)
+
+            per_sector = ordered.groupby("sector", sort=False, observed=True).head(n).copy()
+            per_sector["scope"] = per_sector["sector"]
+            per_sector["rank"] = per_sector.groupby("sector", sort=False, observed=True).cumcount() + 1
+
+            board = pd.concat([overall, per_sector], ignore_index=True).rename(columns={metric: "value"})
+            board["metric"] = metric
+            board["direction"] = direction
+            boards.append(board)
+
+    if not boards:
+        return pd.DataFrame()
+    leaderboards = pd.concat(boards, ignore_index=True)[["scope", "metric", "direction", "rank", "company", "sector", "value"]]
+    return leaderboards.astype({"value": "float64"})
+
+def store_leaderboards(engine, leaderboards_df: pd.DataFrame) -> bool:
+    """Replaces the leaderboards table and indexes it for constant-time top-N lookups."""
+    from sqlalchemy import text
+
+    insert_data_into_db(engine, leaderboards_df, TABLE_LEADERBOARDS)
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS {TABLE_LEADERBOARDS}_lookup_idx "
+            f"ON {TABLE_LEADERBOARDS} (metric, scope, direction, rank)"
+        ))
+    return True
+
+def build_company_insights(engine) -> bool:
+    """
+    Rebuilds `company_insights` from `sensor_data` in SQL and swaps it in atomically.
+
+    Returns:
+        bool: True once the new table is in place.
+    """
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        for statement in BUILD_COMPANY_INSIGHTS_SQL:
+            conn.execute(text(statement))
+    with engine.connect() as conn:
+        swap_in_table(conn, f"{TABLE_COMPANY_INSIGHTS}_staging", TABLE_COMPANY_INSIGHTS)
+    print(f"Company insights rebuilt in {TABLE_COMPANY_INSIGHTS}.")
+    return True
+
 def main() -> bool:
     """Main function to orchestrate insights processing."""
     try:
         print("Starting insights computation process...")
         load_env()  # Load & validate environment variables
         engine = get_db_engine()  # Create DB connection
-        df = fetch_table_data(engine, TABLE_SENSOR_DATA)  # Fetch data
+        with StageTimer("process_insights", "fetch") as stage:
+            df = fetch_table_data(engine, TABLE_SENSOR_DATA)  # Fetch data
+            stage.rows = 0 if df is None else len(df)
+        memory_report(df, "process_insights", "fetch")
+
+        if df is not None and analytics_engine() == "duckdb":
+            try:
+                with StageTimer("process_insights", "analytics_snapshot", rows=len(df)):
+                    write_snapshot(df)  # Parquet copy of sensor_data queried by DuckDB
+            except Exception as e:
+                print(f"Warning: Could not write the analytics snapshot: {e}")
 
         if df is not None:
-            insights_df = compute_insights(df)  # Compute insights
+            with StageTimer("process_insights", "aggregate", rows=len(df)):
+                insights_df = compute_insights(df)  # Compute insights
             if not insights_df.empty:
-                return insert_data_into_db(engine, insights_df, TABLE_INSIGHTS)  # Insert into DB
+                with StageTimer("process_insights", "insert", rows=len(insights_df)):
+                    inserted = insert_data_into_db(engine, insights_df, TABLE_INSIGHTS)  # Insert into DB
+                with StageTimer("process_insights", "leaderboards", rows=len(df)):
+                    store_leaderboards(engine, compute_leaderboards(df))  # Precompute top-N tables
+                with StageTimer("process_insights", "company_insights"):
+                    build_company_insights(engine)  # Precompute per-company aggregates for /companies
+                with StageTimer("process_insights", "search_index"):
+                    build_company_search_index(engine)  # Refresh company search/autocomplete index
+                notify_data_changed(engine, "insights")
+                return inserted
     except Exception as e:
         print(f"Error occurred: {e}")
         sys.exit(1)
@@ -17,6 +17,57 @@ CREATE TABLE IF NOT EXISTS insights (
     avg_co2_emissions FLOAT
 );
 
+-- Create leaderboards table (top/bottom companies per metric and sector, rebuilt by process_insights)
+CREATE TABLE IF NOT EXISTS leaderboards (
+    scope VARCHAR(100),
+    metric VARCHAR(50),
+    direction VARCHAR(4),
+    rank INTEGER,
+    company VARCHAR(255),
+    sector VARCHAR(100),
+    value FLOAT
+);
+CREATE INDEX IF NOT EXISTS leaderboards_lookup_idx ON leaderboards (metric, scope, direction, rank);
+
+-- Enable trigram matching (fuzzy company search)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Create company search table (rebuilt from sensor_data by process_insights)
+CREATE TABLE IF NOT EXISTS company_search (
+    company VARCHAR(255),
+    sector VARCHAR(100)
+);
+CREATE INDEX IF NOT EXISTS company_search_prefix_idx ON company_search (lower(company) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS company_search_trgm_idx ON company_search USING gin (company gin_trgm_ops);
+
+-- Create company insights table (per-company aggregates, rebuilt and swapped in by process_insights)
+CREATE TABLE IF NOT EXISTS company_insights (
+    company VARCHAR(255),
+    sector VARCHAR(100),
+    readings BIGINT,
+    energy_kwh FLOAT,
+    water_m3 FLOAT,
+    co2_emissions FLOAT,
+    avg_energy_kwh FLOAT,
+    avg_water_m3 FLOAT,
+    avg_co2_emissions FLOAT,
+    co2_per_kwh FLOAT,
+    water_per_kwh FLOAT,
+    energy_sector_percentile FLOAT,
+    co2_sector_percentile FLOAT,
+    co2_intensity_sector_percentile FLOAT
+);
+CREATE INDEX IF NOT EXISTS company_insights_sector_company_idx ON company_insights (sector, company);
+
+-- Create distributions table (mergeable quantile sketches per metric and sector, updated on every load)
+CREATE TABLE IF NOT EXISTS distributions (
+    scope VARCHAR(100) NOT NULL,
+    metric VARCHAR(50) NOT NULL,
+    sketch TEXT NOT NULL,
+    updated_at BIGINT NOT NULL DEFAULT EXTRACT(EPOCH FROM NOW()),
+    PRIMARY KEY (scope, metric)
+);
+
 -- Create users table
 CREATE TABLE IF NOT EXISTS users (
     id SERIAL PRIMARY KEY,
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+
+from .metrics import record_cache
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine.base import Engine
+
+# Constants
+TABLE_SENSOR_DATA: str = "sensor_data"
+TABLE_COMPANY_SEARCH: str = "company_search"
+MIN_FUZZY_SIMILARITY: float = 0.2
+
+# Deduplicated (company, sector) lookup table with prefix (btree) and fuzzy (pg_trgm GIN) indexes,
+# built aside and then swapped in, so searches keep using the previous table during the rebuild
+BUILD_COMPANY_SEARCH_SQL: List[str] = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"DROP TABLE IF EXISTS {TABLE_COMPANY_SEARCH}_staging",
+    f"""CREATE TABLE {TABLE_COMPANY_SEARCH}_staging AS
+        SELECT DISTINCT company, sector FROM {TABLE_SENSOR_DATA} WHERE company IS NOT NULL""",
+    f"CREATE INDEX {TABLE_COMPANY_SEARCH}_staging_prefix_idx ON {TABLE_COMPANY_SEARCH}_staging (lower(company) text_pattern_ops)",
+    f"CREATE INDEX {TABLE_COMPANY_SEARCH}_staging_trgm_idx ON {TABLE_COMPANY_SEARCH}_staging USING gin (company gin_trgm_ops)",
+    f"ANALYZE {TABLE_COMPANY_SEARCH}_staging",
+]
+
+# Prefix matches first (served by the btree index), then fuzzy trigram matches (GIN index)
+SEARCH_SQL: str = f"""
+    WITH prefix AS (
+        SELECT company, sector, 1.0::float AS score, 0 AS kind
+        FROM {TABLE_COMPANY_SEARCH}
+        WHERE lower(company) LIKE :prefix AND (:sector IS NULL OR sector = :sector)
+        ORDER BY lower(company)
+        LIMIT :limit
+    ), fuzzy AS (
+        SELECT company, sector, similarity(company, :q)::float AS score, 1 AS kind
+        FROM {TABLE_COMPANY_SEARCH}
+        WHERE company % :q AND (:sector IS NULL OR sector = :sector)
+        ORDER BY company <-> :q
+        LIMIT :limit
+    )
+    SELECT company, sector, max(score) AS score, min(kind) AS kind
+    FROM (SELECT * FROM prefix UNION ALL SELECT * FROM fuzzy) matches
+    GROUP BY company, sector
+    ORDER BY min(kind), max(score) DESC, lower(company)
+    LIMIT :limit
+"""
+
+def build_company_search_index(engine: Engine) -> bool:
+    """
+    (Re)builds the `company_search` lookup table and its prefix/trigram indexes from `sensor_data`
+    in a staging table, then swaps it in atomically.
+
+    Returns:
+        bool: True if the table was built, False if it could not be (e.g. pg_trgm is not available).
+    """
+    from sqlalchemy import text
+    from .utils import swap_in_table
+
+    try:
+        with engine.begin() as conn:
+            for statement in BUILD_COMPANY_SEARCH_SQL:
+                conn.execute(text(statement))
+        with engine.connect() as conn:
+            swap_in_table(conn, f"{TABLE_COMPANY_SEARCH}_staging", TABLE_COMPANY_SEARCH)
+        print(f"Company search index rebuilt in {TABLE_COMPANY_SEARCH}.")
+        return True
+    except Exception as e:
+        print(f"Warning: Could not build the company search index, using the in-process index: {e}")
+        return False
+    finally:
+        invalidate_prefix_index()
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def search_companies_db(engine: Engine, q: str, sector: Optional[str] = None, limit: int = 10) -> List[dict]:
+    """Ranked prefix + fuzzy company search served by the PostgreSQL indexes."""
+    from sqlalchemy import text
+
+    params = {"q": q, "prefix": _escape_like(q.lower()) + "%", "sector": sector, "limit": limit}
+    with engine.connect() as conn:
+        rows = conn.execute(text(SEARCH_SQL), params).mappings().all()
+    return [
+        {"company": row["company"], "sector": row["sector"], "score": round(float(row["score"]), 4),
+         "match": "prefix" if row["kind"] == 0 else "fuzzy"}
+        for row in rows
+    ]
+
+def _trigrams(value: str) -> Set[str]:
+    padded = f"  {value.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class PrefixIndex:
+    """
+    In-process company index: sorted names for prefix lookups (bisect) plus a trigram inverted
+    index for fuzzy matches. Used when pg_trgm or the `company_search` table is not available.
+    """
+
+    def __init__(self, entries: List[Tuple[str, str]]):
+        entries = sorted(set(entries), key=lambda entry: (entry[0].lower(), entry[1] or ""))
+        self.entries = entries
+        self.keys = [company.lower() for company, _ in entries]
+        self.trigrams: Dict[str, List[int]] = {}
+        for position, (company, _) in enumerate(entries):
+            for trigram in _trigrams(company):
+                self.trigrams.setdefault(trigram, []).append(position)
+
+    def search(self, q: str, sector: Optional[str] = None, limit: int = 10) -> List[dict]:
+        key = q.lower()
+        results: List[dict] = []
+        seen: Set[int] = set()
+
+        start = bisect.bisect_left(self.keys, key)
+        for position in range(start, len(self.keys)):
+            if len(results) >= limit or not self.keys[position].startswith(key):
+                break
+            company, company_sector = self.entries[position]
+            if sector is None or company_sector == sector:
+                results.append({"company": company, "sector": company_sector, "score": 1.0, "match": "prefix"})
+                seen.add(position)
+
+        if len(results) < limit:
+            query_trigrams = _trigrams(q)
+            shared: Dict[int, int] = {}
+            for trigram in query_trigrams:
+                for position in self.trigrams.get(trigram, ()):
+                    shared[position] = shared.get(position, 0) + 1
+
+            scored = []
+            for position, count in shared.items():
+                if position in seen:
+                    continue
+                company, company_sector = self.entries[position]
+                if sector is not None and company_sector != sector:
+                    continue
+                # Same similarity definition as pg_trgm: shared / (|a| + |b| - shared)
+                score = count / (len(query_trigrams) + len(_trigrams(company)) - count)
+                if score >= MIN_FUZZY_SIMILARITY:
+                    scored.append((-score, self.keys[position], position))
+
+            for negative_score, _, position in sorted(scored)[:limit - len(results)]:
+                company, company_sector = self.entries[position]
+                results.append({"company": company, "sector": company_sector,
+                                "score": round(-negative_score, 4), "match": "fuzzy"})
+        return results
+
+_DB_SEARCH_RETRY_AT: float = 0.0
+_PREFIX_INDEX: Optional[PrefixIndex] = None
+_PREFIX_INDEX_BUILT_AT: float = 0.0
+_PREFIX_INDEX_LOCK = threading.Lock()
+
+def invalidate_prefix_index() -> None:
+    """Drops the in-process index so it is rebuilt on the next search."""
+    global _PREFIX_INDEX, _DB_SEARCH_RETRY_AT
+    _PREFIX_INDEX = None
+    _DB_SEARCH_RETRY_AT = 0.0
+
+def get_prefix_index(engine: Engine) -> PrefixIndex:
+    """Returns the in-process index, (re)building it from `sensor_data` when missing or older than the TTL."""
+    global _PREFIX_INDEX, _PREFIX_INDEX_BUILT_AT
+    from sqlalchemy import text
+
+    ttl = float(os.getenv("SEARCH_INDEX_TTL", "300"))
+    with _PREFIX_INDEX_LOCK:
+        fresh = _PREFIX_INDEX is not None and time.monotonic() - _PREFIX_INDEX_BUILT_AT < ttl
+        record_cache("company_prefix_index", fresh)
+        if not fresh:
+            with engine.connect() as conn:
+                rows = conn.execute(text(
+                    f"SELECT DISTINCT company, sector FROM {TABLE_SENSOR_DATA} WHERE company IS NOT NULL"
+                )).all()
+            _PREFIX_INDEX = PrefixIndex([(row[0], row[1]) for row in rows])
+            _PREFIX_INDEX_BUILT_AT = time.monotonic()
+        return _PREFIX_INDEX
+
+def search_companies(engine: Engine, q: str, sector: Optional[str] = None, limit: int = 10) -> List[dict]:
+    """
+    Ranked company search: prefix matches first, then fuzzy (trigram) matches.
+
+    Uses the PostgreSQL `company_search` table (pg_trgm) unless SEARCH_BACKEND=memory, and falls
+    back to the in-process index when the database search is not available.
+
+    Args:
+        engine (Engine): Database engine connection.
+        q (str): Search text.
+        sector (Optional[str]): Only return companies from this sector.
+        limit (int): Maximum number of results.
+
+    Returns:
+        List[dict]: Results with company, sector, score and match type ("prefix" or "fuzzy").
+    """
+    global _DB_SEARCH_RETRY_AT
+    q = q.strip()
+    if not q:
+        return []
+
+    use_db = os.getenv("SEARCH_BACKEND", "auto").lower() != "memory"
+    if use_db and time.monotonic() >= _DB_SEARCH_RETRY_AT:
+        try:
+            return search_companies_db(engine, q, sector, limit)
+        except Exception as e:
+            # Don't retry the database search on every keystroke while it is unavailable
+            _DB_SEARCH_RETRY_AT = time.monotonic() + float(os.getenv("SEARCH_INDEX_TTL", "300"))
+            print(f"Warning: Database company search failed, using the in-process index: {e}")
+
+    return get_prefix_index(engine).search(q, sector, limit)
@@ -0,0 +1,86 @@
+"""
+Request coalescing ("single-flight") for identical concurrent reads.
+
+While a call for a key is in flight, further callers with the same key wait for it and share
+its result (or exception) instead of issuing the same query again. Nothing is cached: once the
+call finishes, the next caller starts a new one. Shared results must be treated as read-only.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from .metrics import counter, gauge
+
+SINGLEFLIGHT_CALLS = counter(
+    "greenflow_singleflight_calls_total",
+    "Single-flight calls by group and role (leader executed the call, waiter shared its result).",
+    ("group", "role"),
+)
+SINGLEFLIGHT_WAITERS = gauge(
+    "greenflow_singleflight_waiters",
+    "Callers currently waiting on an in-flight call.",
+    ("group",),
+)
+
+class _Call:
+    """An in-flight call: waiters block on `done` and read `result`/`error`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one execution.
+
+    Meant for sync code (the FastAPI threadpool handlers): waiters block their thread until the
+    leader's call returns.
+    """
+
+    def __init__(self, group: str):
+        self.group = group
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def _waiting(self, delta: int) -> None:
+        SINGLEFLIGHT_WAITERS.inc(delta, group=self.group)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Runs `fn()` unless a call with the same key is already in flight, then returns its result.
+
+        Args:
+            key (Hashable): Identity of the call, e.g. the SQL text and its parameters.
+            fn (Callable[[], Any]): The call to execute.
+
+        Returns:
+            Any: The result of `fn()`, shared with every concurrent caller of the same key.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            SINGLEFLIGHT_CALLS.inc(group=self.group, role="waiter")
+            self._waiting(1)
+            try:
+                call.done.wait()
+            finally:
+                self._waiting(-1)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        SINGLEFLIGHT_CALLS.inc(group=self.group, role="leader")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
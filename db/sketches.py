@@ -0,0 +1,177 @@
+"""
+Mergeable quantile sketch with relative-error guarantees (DDSketch-style logarithmic buckets).
+
+A sketch built from any number of batches can be merged with others without loss, so
+distributions can be updated incrementally on every load, and it serializes to a few KB.
+Histograms (linear or log bins) and boxplot statistics are derived from the buckets.
+"""
+import math
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_RELATIVE_ACCURACY: float = 0.01
+
+class QuantileSketch:
+    """
+    Quantile sketch: any quantile estimate is within `relative_accuracy` of a true value.
+
+    Positive values are counted in logarithmic buckets (bucket i covers (gamma^(i-1), gamma^i]);
+    zeros and negative values are tracked separately (mirrored buckets for negatives).
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _index(self, value: float) -> int:
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def _value(self, index: int) -> float:
+        # Representative value of a bucket (minimizes the relative error)
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add_many(self, values: Iterable[float]) -> "QuantileSketch":
+        """Adds values (vectorized when given a numpy array or pandas Series)."""
+        import numpy as np
+
+        array = np.asarray(values, dtype="float64")
+        array = array[np.isfinite(array)]
+        if array.size == 0:
+            return self
+
+        self.count += int(array.size)
+        self.sum += float(array.sum())
+        self.min = min(self.min, float(array.min()))
+        self.max = max(self.max, float(array.max()))
+        self.zero_count += int((array == 0).sum())
+
+        for store, part in ((self.positive, array[array > 0]), (self.negative, -array[array < 0])):
+            if part.size:
+                indexes = np.ceil(np.log(part) / self._log_gamma).astype("int64")
+                unique, counts = np.unique(indexes, return_counts=True)
+                for index, bucket_count in zip(unique.tolist(), counts.tolist()):
+                    store[index] = store.get(index, 0) + bucket_count
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Merges another sketch (same relative accuracy) into this one."""
+        if not math.isclose(other.gamma, self.gamma):
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, bucket_count in other_store.items():
+                store[index] = store.get(index, 0) + bucket_count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _buckets(self) -> List[tuple]:
+        """(representative value, count) pairs in increasing value order."""
+        buckets = [(-self._value(i), c) for i, c in sorted(self.negative.items(), reverse=True)]
+        if self.zero_count:
+            buckets.append((0.0, self.zero_count))
+        buckets.extend((self._value(i), c) for i, c in sorted(self.positive.items()))
+        return buckets
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        rank = q * (self.count - 1)
+        seen = 0
+        for value, bucket_count in self._buckets():
+            seen += bucket_count
+            if seen > rank:
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def histogram(self, bins: int = 30, scale: str = "linear") -> Dict[str, list]:
+        """
+        Re-bins the sketch into `bins` equal-width (linear) or equal-ratio (log) bins between min and max.
+
+        Returns:
+            Dict[str, list]: {"edges": [...bins + 1 edges], "counts": [...bins counts]}.
+        """
+        if self.count == 0:
+            return {"edges": [], "counts": []}
+        low, high = self.min, self.max
+        if high <= low:
+            return {"edges": [low, high], "counts": [self.count]}
+
+        use_log = scale == "log" and low > 0
+        if use_log:
+            ratio = (high / low) ** (1 / bins)
+            edges = [low * ratio ** i for i in range(bins + 1)]
+        else:
+            width = (high - low) / bins
+            edges = [low + width * i for i in range(bins + 1)]
+        edges[-1] = high
+
+        counts = [0] * bins
+        for value, bucket_count in self._buckets():
+            value = min(max(value, low), high)
+            if use_log:
+                position = int(math.log(value / low) / math.log(ratio))
+            else:
+                position = int((value - low) / width)
+            counts[min(max(position, 0), bins - 1)] += bucket_count
+        return {"edges": edges, "counts": counts}
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Count, mean, min/max, common quantiles and boxplot statistics (Tukey whiskers)."""
+        if self.count == 0:
+            return {"count": 0}
+        q1, median, q3 = self.quantile(0.25), self.quantile(0.5), self.quantile(0.75)
+        iqr = q3 - q1
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count,
+            "min": self.min,
+            "max": self.max,
+            "quantiles": {str(q): self.quantile(q) for q in (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)},
+            "boxplot": {
+                "q1": q1,
+                "median": median,
+                "q3": q3,
+                "whislo": max(self.min, q1 - 1.5 * iqr),
+                "whishi": min(self.max, q3 + 1.5 * iqr),
+            },
+        }
+
+    def to_dict(self) -> dict:
+        """JSON-serializable representation."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(i): c for i, c in self.positive.items()},
+            "negative": {str(i): c for i, c in self.negative.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        sketch = cls(data.get("relative_accuracy", DEFAULT_RELATIVE_ACCURACY))
+        sketch.positive = {int(i): int(c) for i, c in data.get("positive", {}).items()}
+        sketch.negative = {int(i): int(c) for i, c in data.get("negative", {}).items()}
+        sketch.zero_count = int(data.get("zero_count", 0))
+        sketch.count = int(data.get("count", 0))
+        sketch.sum = float(data.get("sum", 0.0))
+        sketch.min = math.inf if data.get("min") is None else float(data["min"])
+        sketch.max = -math.inf if data.get("max") is None else float(data["max"])
+        return sketch
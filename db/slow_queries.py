@@ -0,0 +1,137 @@
+"""
+Slow-query capture through SQLAlchemy engine events.
+
+Every statement taking longer than SLOW_QUERY_MS is recorded in a per-process ring buffer
+(the last SLOW_QUERY_KEEP). Read-only statements are then re-run once under
+`EXPLAIN (ANALYZE, BUFFERS)` in a background thread, on a separate connection of the same
+engine, so the plan is captured without slowing down the request that ran the query.
+"""
+from __future__ import annotations
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+from .metrics import counter
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine.base import Engine
+
+# Constants
+DEFAULT_SLOW_QUERY_MS: float = 500.0
+DEFAULT_SLOW_QUERY_KEEP: int = 50
+EXPLAIN_COOLDOWN_SECONDS: float = 60.0  # The same statement is explained at most once per cooldown
+MAX_PARAMETERS_LENGTH: int = 500
+
+# Only plain reads are re-executed by EXPLAIN ANALYZE; these functions have side effects
+READ_ONLY_STATEMENT = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+SIDE_EFFECT_FUNCTIONS = re.compile(
+    r"\b(pg_notify|pg_advisory\w*|nextval|setval|pg_sleep)\b|\b(INSERT|UPDATE|DELETE)\b|\bFOR\s+UPDATE\b",
+    re.IGNORECASE,
+)
+
+SLOW_QUERIES = counter("greenflow_slow_queries_total", "Statements slower than SLOW_QUERY_MS, by whether they were explained.", ("explained",))
+
+_SLOW_QUERIES: Deque[dict] = deque(maxlen=int(os.getenv("SLOW_QUERY_KEEP", str(DEFAULT_SLOW_QUERY_KEEP))))
+_LOCK = threading.Lock()
+_EXPLAINED_AT: Dict[str, float] = {}
+_EXPLAIN_RUNNING = threading.Semaphore(1)  # One EXPLAIN ANALYZE at a time per process
+
+def slow_query_ms() -> float:
+    """Threshold above which a statement is captured (SLOW_QUERY_MS, 0 disables the capture)."""
+    return float(os.getenv("SLOW_QUERY_MS", str(DEFAULT_SLOW_QUERY_MS)))
+
+def explain_enabled() -> bool:
+    """True when slow reads are re-run under EXPLAIN (ANALYZE, BUFFERS) (SLOW_QUERY_EXPLAIN=1)."""
+    return os.getenv("SLOW_QUERY_EXPLAIN", "1").lower() in ("1", "true", "yes")
+
+def install_slow_query_capture(engine: Engine) -> None:
+    """
+    Registers the slow-query hooks on an engine (no-op when SLOW_QUERY_MS is 0).
+
+    Args:
+        engine (Engine): Engine whose statements are timed.
+    """
+    from sqlalchemy import event
+
+    threshold = slow_query_ms()
+    if threshold <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _check_duration(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started_at")
+        if not started:
+            return
+        duration_ms = (time.perf_counter() - started.pop()) * 1000
+        if duration_ms >= threshold:
+            record_slow_query(engine, statement, parameters, duration_ms, executemany)
+
+def _explainable(statement: str, executemany: bool) -> bool:
+    return not executemany and bool(READ_ONLY_STATEMENT.match(statement)) and not SIDE_EFFECT_FUNCTIONS.search(statement)
+
+def record_slow_query(engine: Engine, statement: str, parameters: Any, duration_ms: float, executemany: bool = False) -> dict:
+    """
+    Records a slow statement and, for reads, schedules its EXPLAIN (ANALYZE, BUFFERS) capture.
+
+    Returns:
+        dict: The recorded entry (its "plan" is filled in once the EXPLAIN has run).
+    """
+    entry = {
+        "captured_at": time.time(),
+        "duration_ms": round(duration_ms, 2),
+        "database": engine.url.database,
+        "host": engine.url.host,
+        "statement": statement.strip(),
+        "parameters": repr(parameters)[:MAX_PARAMETERS_LENGTH],
+        "plan": None,
+        "explain_error": None,
+    }
+    key = entry["statement"]
+    now = time.monotonic()
+    with _LOCK:
+        _SLOW_QUERIES.append(entry)
+        explain = (explain_enabled() and _explainable(statement, executemany)
+                   and now - _EXPLAINED_AT.get(key, -EXPLAIN_COOLDOWN_SECONDS) >= EXPLAIN_COOLDOWN_SECONDS
+                   and _EXPLAIN_RUNNING.acquire(blocking=False))
+        if explain:
+            if len(_EXPLAINED_AT) >= 1000:
+                _EXPLAINED_AT.clear()
+            _EXPLAINED_AT[key] = now
+    print(f"Warning: Slow query ({duration_ms:.0f} ms): {key[:200]}")
+    SLOW_QUERIES.inc(explained=str(explain).lower())
+
+    if explain:
+        threading.Thread(
+            target=_explain, args=(engine, statement, parameters, entry), name="slow-query-explain", daemon=True
+        ).start()
+    return entry
+
+def _explain(engine: Engine, statement: str, parameters: Any, entry: dict) -> None:
+    try:
+        raw_connection = engine.raw_connection()
+        try:
+            with raw_connection.cursor() as cursor:
+                # The statement runs once more; it is rolled back, and only reads get here
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters or None)
+                entry["plan"] = "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            raw_connection.rollback()
+            raw_connection.close()
+    except Exception as e:
+        entry["explain_error"] = str(e)
+    finally:
+        _EXPLAIN_RUNNING.release()
+
+def recent_slow_queries(limit: Optional[int] = None) -> List[dict]:
+    """The most recent slow queries of this process, newest first."""
+    with _LOCK:
+        entries = list(reversed(_SLOW_QUERIES))
+    return [dict(entry) for entry in entries[:limit]]
@@ -1,46 +1,210 @@
+from __future__ import annotations
+
+import multiprocessing
 import os
-import sys
-import pandas as pd
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine.base import Engine
-from dotenv import load_dotenv, find_dotenv
-from typing import Dict, Optional
-import bcrypt
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, TypeVar
 from pydantic import BaseModel
 import time
+from .config import ENV_VARS, get_settings
+from .slow_queries import install_slow_query_capture
+from .metrics import DB_QUERY_DURATION, DB_ROWS_RETURNED, DATAFRAME_CONVERSION_DURATION, record_cache
+
+# Heavy modules (pandas, SQLAlchemy, bcrypt) are imported on first use, so that importing
+# this module (and the API) stays cheap on cold start.
+if TYPE_CHECKING:
+    import pandas as pd
+    from sqlalchemy.engine.base import Engine
 
-ENV_VARS: list[str] = ["POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB", "POSTGRES_HOST", "POSTGRES_PORT"]
+T = TypeVar("T")
 
 def load_env() -> None:
-    """Loads environment variables and validates required ones."""
-    if not find_dotenv():
-        print("Warning: .env file not found. Ensure it exists before running this script.")
-    
-    load_dotenv()
+    """Loads environment variables and validates required ones (cached after the first call)."""
+    get_settings()
 
-    # Validate required environment variables
-    missing_vars: list[str] = [var for var in ENV_VARS if not os.getenv(var)]
-    if missing_vars:
-        print(f"Error: Missing environment variables: {', '.join(missing_vars)}")
-        sys.exit(1)
+# One engine (and connection pool) per process and database URL. Keyed by PID so that a worker
+# forked from a preloading master never reuses the parent's pooled connections.
+_ENGINES: Dict[Tuple[int, str], Engine] = {}
 
-def get_db_engine() -> Engine:
-    """Creates and returns a PostgreSQL SQLAlchemy engine."""
-    POSTGRES_USER: str = os.getenv("POSTGRES_USER", "")
-    POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "")
-    POSTGRES_HOST: str = os.getenv("POSTGRES_HOST", "")
-    POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "")
-    POSTGRES_DB: str = os.getenv("POSTGRES_DB", "")
-
-    if not all([POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB]):
-        print("Error: One or more required database environment variables are missing.")
-        sys.exit(1)
-
-    database_url: str = (
-        f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
-        f"@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
+# Read-replica routing state (per process)
+_REPLICA_LOCK = threading.Lock()
+_REPLICA_HEALTH: Dict[str, Tuple[bool, float]] = {}  # url -> (healthy, checked_at)
+_REPLICA_CURSOR: int = 0
+_HEALTH_CHECKER: Optional[threading.Thread] = None
+_HEALTH_CHECKER_PID: int = 0
+
+# Read-your-writes pin (wall-clock deadline) in shared memory. It is created on import, i.e. in the
+# gunicorn master with preload_app, so a pin set by the worker that served a write is seen by all workers.
+_PRIMARY_PIN_UNTIL = multiprocessing.Value("d", 0.0)
+
+# Replication lag in seconds; 0 when the replica has replayed everything it received
+REPLICA_LAG_QUERY: str = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+def _get_engine(database_url: str) -> Engine:
+    """Creates (once per process) and returns the engine for a database URL."""
+    key = (os.getpid(), database_url)
+    engine = _ENGINES.get(key)
+    record_cache("db_engine", engine is not None)
+    if engine is not None:
+        return engine
+
+    from sqlalchemy import create_engine
+
+    settings = get_settings()
+    engine = create_engine(
+        database_url,
+        pool_size=settings.pool_size,
+        max_overflow=settings.max_overflow,
+        pool_pre_ping=True,
+        connect_args={"connect_timeout": settings.connect_timeout},
     )
-    return create_engine(database_url)
+    install_slow_query_capture(engine)
+    _ENGINES[key] = engine
+    return engine
+
+def get_db_engine() -> Engine:
+    """Creates (once per process) and returns the PostgreSQL SQLAlchemy engine of the primary."""
+    return _get_engine(get_settings().database_url)
+
+def dispose_db_engines() -> None:
+    """
+    Drops every engine cached in this process without closing the parent's connections.
+
+    Meant to be called right after a fork (e.g. gunicorn `post_fork`), so each worker opens its own pool.
+    """
+    for engine in _ENGINES.values():
+        engine.dispose(close=False)
+    _ENGINES.clear()
+    _REPLICA_HEALTH.clear()
+
+def pin_primary_reads(seconds: Optional[float] = None) -> None:
+    """
+    Routes reads of every API worker to the primary for a while (read-your-writes after a load).
+
+    Args:
+        seconds (Optional[float]): Pin duration. Defaults to POSTGRES_READ_YOUR_WRITES_SECONDS.
+    """
+    duration = get_settings().read_your_writes_seconds if seconds is None else seconds
+    with _PRIMARY_PIN_UNTIL.get_lock():
+        _PRIMARY_PIN_UNTIL.value = max(_PRIMARY_PIN_UNTIL.value, time.time() + duration)
+
+def mark_replica_unhealthy(database_url: str) -> None:
+    """Takes a replica out of the rotation until its next background health check."""
+    with _REPLICA_LOCK:
+        _REPLICA_HEALTH[database_url] = (False, time.monotonic())
+
+def _check_replica(database_url: str) -> bool:
+    """Returns True if the replica answers and its replication lag is acceptable."""
+    from sqlalchemy import text
+
+    settings = get_settings()
+    try:
+        with _get_engine(database_url).connect() as conn:
+            lag = float(conn.execute(text(REPLICA_LAG_QUERY)).scalar() or 0)
+        healthy = lag <= settings.replica_max_lag_seconds
+        if not healthy:
+            print(f"Warning: Read replica lagging by {lag:.1f}s, routing reads elsewhere.")
+    except Exception as e:
+        print(f"Warning: Read replica health check failed: {e}")
+        healthy = False
+    return healthy
+
+def _check_replicas_forever(replica_urls: Tuple[str, ...]) -> None:
+    """Health-checks every replica each POSTGRES_REPLICA_HEALTH_INTERVAL seconds (background thread)."""
+    interval = get_settings().replica_health_interval
+    while True:
+        for url in replica_urls:
+            healthy = _check_replica(url)
+            with _REPLICA_LOCK:
+                _REPLICA_HEALTH[url] = (healthy, time.monotonic())
+        time.sleep(interval)
+
+def _ensure_health_checker(replica_urls: Tuple[str, ...]) -> None:
+    """Starts the replica health-check thread of this process (again in a forked worker)."""
+    global _HEALTH_CHECKER, _HEALTH_CHECKER_PID
+    with _REPLICA_LOCK:
+        if _HEALTH_CHECKER is not None and _HEALTH_CHECKER_PID == os.getpid() and _HEALTH_CHECKER.is_alive():
+            return
+        _HEALTH_CHECKER = threading.Thread(
+            target=_check_replicas_forever, args=(replica_urls,), name="replica-health", daemon=True
+        )
+        _HEALTH_CHECKER_PID = os.getpid()
+        _HEALTH_CHECKER.start()
+
+def _is_replica_healthy(database_url: str) -> bool:
+    """
+    Returns the health of a replica as last checked in the background.
+
+    The probe never runs on the request path, so a replica that is down does not make a request wait
+    for its connect timeout; a replica is skipped until its first check has passed.
+    """
+    return _REPLICA_HEALTH.get(database_url, (False, 0.0))[0]
+
+def _read_candidates() -> List[Tuple[str, Engine]]:
+    """(url, engine) pairs to try for a read-only query, the primary last."""
+    global _REPLICA_CURSOR
+    settings = get_settings()
+    replicas = list(settings.read_replica_urls)
+    primary = (settings.database_url, get_db_engine())
+    if not replicas or time.time() < _PRIMARY_PIN_UNTIL.value:
+        return [primary]
+
+    with _REPLICA_LOCK:
+        start = _REPLICA_CURSOR % len(replicas)
+        _REPLICA_CURSOR += 1
+    ordered = replicas[start:] + replicas[:start]
+
+    _ensure_health_checker(settings.read_replica_urls)
+    candidates = [(url, _get_engine(url)) for url in ordered if _is_replica_healthy(url)]
+    candidates.append(primary)
+    return candidates
+
+def get_read_engine() -> Engine:
+    """
+    Returns the engine a read-only query should use.
+
+    Healthy replicas are picked in round-robin order, falling back to the primary when every
+    replica is down or when reads are pinned right after a write (see `pin_primary_reads`).
+
+    Returns:
+        Engine: Replica engine, or the primary engine.
+    """
+    return _read_candidates()[0][1]
+
+def with_read_failover(query: Callable[[Engine], T]) -> T:
+    """
+    Runs a read-only query on a replica, failing over to the next replica and then to the primary.
+
+    Args:
+        query (Callable[[Engine], T]): Function running the query against the given engine.
+
+    Returns:
+        T: The query result.
+    """
+    from sqlalchemy.exc import DBAPIError
+
+    candidates = _read_candidates()
+    for url, engine in candidates[:-1]:
+        try:
+            return query(engine)
+        except DBAPIError as e:
+            if not e.connection_invalidated and not isinstance(e.orig, _connection_errors()):
+                raise
+            print(f"Warning: Read replica failed, failing over: {e}")
+            mark_replica_unhealthy(url)
+    return query(candidates[-1][1])
+
+def _connection_errors() -> tuple:
+    """DBAPI exceptions signalling a broken connection rather than a bad query."""
+    import psycopg2
+
+    return (psycopg2.OperationalError, psycopg2.InterfaceError)
 
 def load_parquet_data(file_path: str, column_mapping: Dict[str, str]) -> pd.DataFrame:
     """
@@ -53,16 +217,23 @@ def load_parquet_data(file_path: str, column_mapping: Dict[str, str]) -> pd.Data
     Returns:
         pd.DataFrame: Transformed DataFrame with renamed columns.
     """
+    import pandas as pd
+
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Error: Parquet file not found at {file_path}")
 
+    from .frames import CATEGORICAL_COLUMNS, compact_frame
+
     print(f"Reading Parquet file: {file_path}")
-    df: pd.DataFrame = pd.read_parquet(file_path)
+    # Label columns are decoded straight into categoricals (never materialized as Python strings)
+    dictionary_columns = [source for source, target in column_mapping.items() if target in CATEGORICAL_COLUMNS]
+    df: pd.DataFrame = pd.read_parquet(file_path, engine="pyarrow", read_dictionary=dictionary_columns)
 
     # Rename columns to match PostgreSQL schema
     df.rename(columns=column_mapping, inplace=True)
 
-    return df
+    # Metrics stay float64 here: they are written to the database as loaded
+    return compact_frame(df, float32=False)
 
 def insert_data_into_db(engine: Engine, df: pd.DataFrame, table_name: str, if_exists: str = "replace") -> bool:
     """
@@ -75,10 +246,177 @@ def insert_data_into_db(engine: Engine, df: pd.DataFrame, table_name: str, if_ex
         if_exists (str): How to handle existing data ("replace", "append", "fail").
     """
     print(f"Inserting data into PostgreSQL table: {table_name}...")
-    df.to_sql(table_name, engine, if_exists=if_exists, index=False)
+    with DB_QUERY_DURATION.time(table=table_name):
+        if if_exists == "replace":
+            # Never drop the live table: readers keep the old data until the new table is swapped in
+            replace_table_data(engine, df, table_name)
+        else:
+            df.to_sql(table_name, engine, if_exists=if_exists, index=False)
     print(f"Data successfully loaded into {table_name}.")
     return True
 
+def replace_table_data(engine: Engine, df: pd.DataFrame, table_name: str) -> int:
+    """
+    Replaces the contents of a table without downtime: build a staging table, then swap it in.
+
+    The staging table is created `LIKE` the live one (columns, defaults, primary key and indexes),
+    filled with COPY and analyzed; the live table is then replaced by an atomic rename (see
+    `swap_in_table`). Concurrent replaces of the same table are serialized with an advisory lock.
+
+    Args:
+        engine (Engine): Database engine connection (primary).
+        df (pd.DataFrame): New contents of the table.
+        table_name (str): Table to replace (created from the DataFrame if it does not exist).
+
+    Returns:
+        int: Number of rows loaded.
+    """
+    from sqlalchemy import text
+
+    staging_table = f"{table_name}_staging"
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": staging_table})
+        try:
+            conn.execute(text(f"DROP TABLE IF EXISTS {staging_table}"))
+            if conn.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": table_name}).scalar():
+                conn.execute(text(f"CREATE TABLE {staging_table} (LIKE {table_name} INCLUDING ALL)"))
+            else:
+                df.head(0).to_sql(staging_table, conn, index=False)
+            # Timed once, under the live table name, by insert_data_into_db
+            rows = copy_dataframe_into_db(engine, df, staging_table, connection=conn.connection, timed=False)
+            conn.execute(text(f"ANALYZE {staging_table}"))
+            conn.commit()
+            swap_in_table(conn, staging_table, table_name)
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": staging_table})
+            conn.commit()
+    return rows
+
+def copy_dataframe_into_db(engine: Engine, df: pd.DataFrame, table_name: str, connection=None, timed: bool = True) -> int:
+    """
+    Bulk-appends DataFrame rows to an existing PostgreSQL table with COPY (much faster than INSERTs).
+
+    Args:
+        engine (Engine): Database engine connection.
+        df (pd.DataFrame): DataFrame whose columns match (a subset of) the table columns.
+        table_name (str): Name of the target table.
+        connection: Optional DBAPI connection to use (the caller then owns the transaction).
+        timed (bool): Record the COPY in DB_QUERY_DURATION (False when the caller times the whole write).
+
+    Returns:
+        int: Number of rows copied.
+    """
+    import io
+    from contextlib import nullcontext
+
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    columns = ", ".join(f'"{column}"' for column in df.columns)
+    sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+    with DB_QUERY_DURATION.time(table=table_name) if timed else nullcontext():
+        if connection is not None:
+            with connection.cursor() as cursor:
+                cursor.copy_expert(sql, buffer)
+        else:
+            raw_connection = engine.raw_connection()
+            try:
+                with raw_connection.cursor() as cursor:
+                    cursor.copy_expert(sql, buffer)
+                raw_connection.commit()
+            finally:
+                raw_connection.close()
+    return len(df)
+
+def swap_table(connection, staging_table: str, table_name: str) -> None:
+    """
+    Replaces `table_name` with a fully built `staging_table` (rename swap), inside the caller's transaction.
+
+    Readers keep using the old table until the transaction commits and then see the new one; they
+    never see a missing or partially loaded table. Staging indexes take the name of the live index
+    with the same definition (or their name with the staging prefix replaced), and sequences owned
+    by the live table (SERIAL ids) are handed over to the staging table so they survive the drop.
+
+    Args:
+        connection: SQLAlchemy connection with an open transaction (e.g. from `engine.begin()`).
+        staging_table (str): Built table to swap in.
+        table_name (str): Table to replace.
+    """
+    from sqlalchemy import text
+
+    def indexes(table: str) -> List[Tuple[str, str]]:
+        rows = connection.execute(
+            text("SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = current_schema() AND tablename = :table"),
+            {"table": table},
+        ).all()
+        # Definition without the index and table names, e.g. ("CREATE UNIQUE INDEX", "btree (id)")
+        return [(name, (definition.split(" ON ")[0].replace(name, ""), definition.partition(" USING ")[2]))
+                for name, definition in rows]
+
+    live_indexes = {definition: name for name, definition in indexes(table_name)}
+    staging_indexes = indexes(staging_table)
+    staging_columns = set(connection.execute(
+        text("SELECT attname FROM pg_attribute WHERE attrelid = to_regclass(:table) AND attnum > 0 AND NOT attisdropped"),
+        {"table": staging_table},
+    ).scalars().all())
+    sequences = connection.execute(
+        text("SELECT attname, pg_get_serial_sequence(:table, attname) FROM pg_attribute "
+             "WHERE attrelid = to_regclass(:table) AND attnum > 0 AND NOT attisdropped"),
+        {"table": table_name},
+    ).all()
+
+    for column, sequence in sequences:
+        if sequence and column in staging_columns:
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {staging_table}.{column}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+    connection.execute(text(f"ALTER TABLE {staging_table} RENAME TO {table_name}"))
+    for index_name, definition in staging_indexes:
+        new_name = live_indexes.pop(definition, None)
+        if new_name is None and index_name.startswith(staging_table):
+            new_name = table_name + index_name[len(staging_table):]
+        if new_name and new_name != index_name:
+            connection.execute(text(f"ALTER INDEX {index_name} RENAME TO {new_name}"))
+
+def swap_in_table(connection, staging_table: str, table_name: str) -> None:
+    """
+    Swaps a built staging table in (see `swap_table`) in its own transaction, retrying on lock timeouts.
+
+    The swap needs an exclusive lock on the live table for a few milliseconds. Waiting for it
+    behind a long-running read would queue every new reader too, so each attempt gives up after
+    POSTGRES_SWAP_LOCK_TIMEOUT_MS and is retried (POSTGRES_SWAP_RETRIES times) with a backoff.
+
+    Args:
+        connection: SQLAlchemy connection without an open transaction.
+        staging_table (str): Built table to swap in.
+        table_name (str): Table to replace.
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from psycopg2.errors import LockNotAvailable
+
+    settings = get_settings()
+    for attempt in range(1, settings.swap_retries + 1):
+        try:
+            connection.execute(text(f"SET LOCAL lock_timeout = {int(settings.swap_lock_timeout_ms)}"))
+            swap_table(connection, staging_table, table_name)
+            connection.commit()
+            return
+        except OperationalError as e:
+            connection.rollback()
+            if not isinstance(e.orig, LockNotAvailable) or attempt == settings.swap_retries:
+                raise
+            print(f"Warning: {table_name} is busy, retrying the swap ({attempt}/{settings.swap_retries})...")
+            time.sleep(min(0.1 * 2 ** attempt, 2.0))
+
+def table_query(table_name: str, where: str = "") -> str:
+    """SQL text used by `fetch_table_data` (also identifies identical concurrent reads)."""
+    query: str = f"SELECT * FROM {table_name}"
+    if where and len(where) > 0:
+        query += f" WHERE {where}"
+    return query
+
 def fetch_table_data(engine: Engine, table_name: str, where: str = "") -> Optional[pd.DataFrame]:
     """
     Fetches all data from a given PostgreSQL table.
@@ -90,10 +428,17 @@ def fetch_table_data(engine: Engine, table_name: str, where: str = "") -> Option
     Returns:
         Optional[pd.DataFrame]: Data from the table or None if empty.
     """
-    query: str = f"SELECT * FROM {table_name}"
-    if where and len(where) > 0:
-        query += f" WHERE {where}"
-    df: pd.DataFrame = pd.read_sql(query, engine)
+    from .frames import read_sql_chunks, combine_chunks, table_dtypes
+
+    query: str = table_query(table_name, where)
+
+    # Rows are streamed in typed chunks; concatenation and dtype compaction are timed separately
+    with DB_QUERY_DURATION.time(table=table_name):
+        chunks = read_sql_chunks(engine, query, table_dtypes(table_name))
+
+    with DATAFRAME_CONVERSION_DURATION.time(table=table_name):
+        df: pd.DataFrame = combine_chunks(chunks)
+    DB_ROWS_RETURNED.inc(len(df), table=table_name)
 
     if df.empty:
         print(f"Warning: No data found in {table_name} table.")
@@ -123,6 +468,9 @@ def register_user(username: str, password: str) -> bool:
         raise ValueError("Password must be at least 4 characters long.")
 
     try:
+        import bcrypt
+        import pandas as pd
+
         salt = bcrypt.gensalt()
 
         password_hash = bcrypt.hashpw(password.encode("utf-8"), salt)
@@ -178,6 +526,9 @@ def login_user(username: str, password: str) -> bool:
     Raises:
         ValueError: If username or password are invalid.
     """
+    import bcrypt
+    from sqlalchemy import text
+
     user = find_user(username)
     if not bcrypt.checkpw(password.encode("utf-8"), user.password_hash.encode("utf-8")):
         raise ValueError("Invalid credentials: Password does not match")